@@ -1,9 +1,8 @@
+import functools
+
 from langchain import OpenAI
 from langchain.agents import initialize_agent, Tool
 
-# Initialisiere LLM
-llm = OpenAI(temperature=0.2)
-
 
 # Tool: Dateiansicht (liest history.csv)
 def view_history(path: str) -> str:
@@ -13,16 +12,27 @@ def view_history(path: str) -> str:
     return df.tail(5).to_string()
 
 
-tools = [
-    Tool(
-        name="ViewHistory",
-        func=view_history,
-        description="Zeigt die letzten Zeilen von history.csv",
-    )
-]
+@functools.lru_cache(maxsize=1)
+def build_agent():
+    # Initialisiere LLM (erst bei Bedarf, nicht beim Import)
+    llm = OpenAI(temperature=0.2)
+
+    tools = [
+        Tool(
+            name="ViewHistory",
+            func=view_history,
+            description="Zeigt die letzten Zeilen von history.csv",
+        )
+    ]
+
+    return initialize_agent(tools, llm, agent="zero-shot-react-description")
+
+
+def main():
+    # Beispiel-Abfrage
+    result = build_agent().run("Zeige mir die letzten 5 Einträge in history.csv")
+    print(result)
 
-agent = initialize_agent(tools, llm, agent="zero-shot-react-description")
 
-# Beispiel-Abfrage
-result = agent.run("Zeige mir die letzten 5 Einträge in history.csv")
-print(result)
+if __name__ == "__main__":
+    main()
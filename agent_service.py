@@ -1,20 +1,41 @@
 # agent_service.py — Local Autonomy Agent (Windows-friendly)
-# - Liest Tasks aus agent_inbox/*.json
+# - Liest Tasks aus agent_inbox/*.json (Events via watchfiles, Fallback watchdog)
 # - Prüft Policies (Whitelist), erzeugt Diffs/Vorschläge
 # - Wartet auf deine Freigabe (approve), wendet Änderungen an
 # - Kann Bot/Bridge/Dashboard neu starten
 # - Schreibt Status nach agent_outbox/
 
-import json
+import asyncio
+import multiprocessing
+import os
+import re
 import time
-import subprocess
 import difflib
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any, Set
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# watchfiles bevorzugt, sonst watchdog als Fallback
+from bridge_io import WATCHFILES_AVAILABLE as _WATCHFILES_AVAILABLE, watchfiles
+from bridge_io import dumps, loads as _loads
+
+# C++-Implementierung von diff-match-patch fuer grosse Dateien, sonst difflib
+try:
+    from fast_diff_match_patch import diff as _dmp_diff
+
+    _DMP_AVAILABLE = True
+except Exception:
+    _DMP_AVAILABLE = False
+
+
+def _dumps(obj: Any) -> bytes:
+    # Inbox/Outbox-JSON wird auch von Menschen gelesen -> eingerueckt
+    return dumps(obj, indent=True)
+
+
 ROOT = Path.cwd()
 INBOX = ROOT / "agent_inbox"
 OUTBOX = ROOT / "agent_outbox"
@@ -39,14 +60,35 @@ DEFAULT_POLICY = {
 }
 POLICY_FILE = POLICY_DIR / "whitelist.json"
 if not POLICY_FILE.exists():
-    POLICY_FILE.write_text(json.dumps(DEFAULT_POLICY, indent=2), encoding="utf-8")
+    POLICY_FILE.write_bytes(_dumps(DEFAULT_POLICY))
+
+
+def compile_policy(policy: Dict[str, Any]) -> Dict[str, Any]:
+    """Ergaenzt die Policy um "_allowed_re": alle allowed_paths als eine Alternation."""
+    # \Z statt $: "$" wuerde auch vor einem abschliessenden Newline matchen ("bot.py\n")
+    alts = [
+        f"{re.escape(pat)}\\Z|{re.escape(pat.rstrip('/'))}/"
+        for pat in policy.get("allowed_paths", [])
+    ]
+    # leere Whitelist: nichts erlauben (eine leere Alternation wuerde alles matchen)
+    allowed_re = re.compile("(?:" + "|".join(alts) + ")") if alts else re.compile("(?!)")
+    return {**policy, "_allowed_re": allowed_re}
+
+
+# Policy nur neu parsen, wenn sich whitelist.json geaendert hat (st_mtime_ns)
+_policy_cache: Dict[str, Any] = {"mtime": None, "policy": None}
 
 
 def load_policy() -> Dict[str, Any]:
     try:
-        return json.loads(POLICY_FILE.read_text(encoding="utf-8"))
+        mtime = POLICY_FILE.stat().st_mtime_ns
+        if mtime == _policy_cache["mtime"]:
+            return _policy_cache["policy"]
+        policy = compile_policy(_loads(POLICY_FILE.read_bytes()))
     except Exception:
-        return DEFAULT_POLICY
+        return compile_policy(DEFAULT_POLICY)
+    _policy_cache.update(mtime=mtime, policy=policy)
+    return policy
 
 
 # ---- Helpers ----
@@ -59,89 +101,184 @@ def safe_path(rel: str) -> Path:
 
 def is_allowed_path(rel: str, policy) -> bool:
     rel = rel.replace("\\", "/")
-    for pat in policy.get("allowed_paths", []):
-        if rel == pat or rel.startswith(pat.rstrip("/") + "/"):
-            return True
-    return False
+    # "strategies/../.env" beginnt mit einem erlaubten Praefix, zeigt aber woanders hin
+    if ".." in rel.split("/"):
+        return False
+    return bool(policy["_allowed_re"].match(rel))
 
 
 def write_out(name: str, payload: Dict[str, Any]) -> Path:
     fn = OUTBOX / f"{int(time.time() * 1000)}_{name}.json"
-    fn.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    fn.write_bytes(_dumps(payload))
     return fn
 
 
-def make_diff(old: str, new: str, path: str) -> str:
-    return "".join(
-        difflib.unified_diff(
-            old.splitlines(keepends=True), new.splitlines(keepends=True), fromfile=path, tofile=path
-        )
+# Zeilen werden fuer den Line-Mode auf je ein Zeichen abgebildet (unterhalb der Surrogates)
+_DMP_MAX_LINES = 0xD7FF
+
+
+class _Opcodes(difflib.SequenceMatcher):
+    """Nutzt difflibs Hunk-Gruppierung mit fertig berechneten Opcodes."""
+
+    def __init__(self, opcodes):
+        self.opcodes = opcodes
+
+    def get_opcodes(self):
+        return self.opcodes
+
+
+def _dmp_opcodes(a: List[str], b: List[str]) -> Optional[list]:
+    index: Dict[str, str] = {}
+    for line in a + b:
+        if line not in index:
+            if len(index) >= _DMP_MAX_LINES:
+                return None
+            index[line] = chr(len(index) + 1)
+    ops = _dmp_diff(
+        "".join(map(index.__getitem__, a)),
+        "".join(map(index.__getitem__, b)),
+        timelimit=0,
+        cleanup="No",
+        counts_only=True,
     )
+    opcodes, i, j = [], 0, 0
+    for op, n in ops:
+        if op == "=":
+            opcodes.append(("equal", i, i + n, j, j + n))
+            i, j = i + n, j + n
+        elif op == "-":
+            opcodes.append(("delete", i, i + n, j, j))
+            i += n
+        else:
+            opcodes.append(("insert", i, i, j, j + n))
+            j += n
+    return opcodes
+
+
+def _hunk_range(start: int, stop: int) -> str:
+    length = stop - start
+    beginning = start + 1 if length else start
+    return str(beginning) if length == 1 else f"{beginning},{length}"
+
+
+def _no_eol(line: str) -> str:
+    # letzte Zeile ohne Umbruch wie bei GNU diff markieren, sonst klebt die naechste Zeile dran
+    return line if line.endswith("\n") else line + "\n\\ No newline at end of file\n"
+
+
+def make_diff(old: str, new: str, path: str) -> str:
+    a, b = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    opcodes = _dmp_opcodes(a, b) if _DMP_AVAILABLE else None
+    if opcodes is None:
+        return "".join(map(_no_eol, difflib.unified_diff(a, b, fromfile=path, tofile=path)))
+
+    out: List[str] = []
+    for group in _Opcodes(opcodes).get_grouped_opcodes(3):
+        if not out:
+            out += [f"--- {path}\n", f"+++ {path}\n"]
+        first, last = group[0], group[-1]
+        out.append(f"@@ -{_hunk_range(first[1], last[2])} +{_hunk_range(first[3], last[4])} @@\n")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out += [_no_eol(" " + line) for line in a[i1:i2]]
+            else:
+                out += [_no_eol("-" + line) for line in a[i1:i2]]
+                out += [_no_eol("+" + line) for line in b[j1:j2]]
+    return "".join(out)
 
 
-def run_cmd(cmd: List[str], cwd: Optional[Path] = None) -> Dict[str, Any]:
+async def run_cmd(cmd: List[str], cwd: Optional[Path] = None) -> Dict[str, Any]:
+    # nicht-blockierend: der Event-Loop wartet per epoll, andere Tasks laufen weiter
     try:
-        proc = subprocess.run(
-            cmd, cwd=str(cwd or ROOT), capture_output=True, text=True, timeout=300
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(cwd or ROOT),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-        return {"cmd": cmd, "code": proc.returncode, "stdout": proc.stdout, "stderr": proc.stderr}
+        try:
+            out, err = await asyncio.wait_for(proc.communicate(), timeout=300)
+        except asyncio.TimeoutError:
+            # wie subprocess.run: Prozess bei Timeout beenden und einsammeln
+            proc.kill()
+            await proc.wait()
+            raise TimeoutError(f"Command {cmd!r} timed out after 300 seconds")
+        return {
+            "cmd": cmd,
+            "code": proc.returncode,
+            "stdout": out.decode(errors="replace"),
+            "stderr": err.decode(errors="replace"),
+        }
     except Exception as e:
         return {"cmd": cmd, "error": str(e)}
 
 
 # ---- Actions ----
-def action_write_file(task, policy):
+# Persistenter Prozess-Pool fuer Policy-Check + Diff; wird in main() einmalig erzeugt
+EXECUTOR: Optional[ProcessPoolExecutor] = None
+
+
+async def offload(fn: Callable[..., Any], *args: Any) -> Any:
+    # ohne Pool (z. B. beim Import in Tests) im Default-Threadpool ausfuehren
+    return await asyncio.get_running_loop().run_in_executor(EXECUTOR, fn, *args)
+
+
+def compute_proposal(kind: str, task, policy) -> Dict[str, Any]:
+    """CPU-lastiger Teil von write_file/patch_file – laeuft im Prozess-Pool."""
     rel = task["path"]
     if not is_allowed_path(rel, policy):
-        return write_out("reject", {"task": task, "reason": "path not allowed"})
+        return {"reject": "path not allowed"}
     p = safe_path(rel)
     before = p.read_text(encoding="utf-8") if p.exists() else ""
-    after = task["content"]
-    diff = make_diff(before, after, rel)
-    proposal = {"type": "write_file", "path": rel, "diff": diff}
+    after = task["content"] if kind == "write_file" else task.get("after")
+    if after is None:
+        return {"reject": "after required for safe patch"}
+    return {"type": kind, "path": rel, "diff": make_diff(before, after, rel)}
+
+
+async def action_write_file(task, policy):
+    proposal = await offload(compute_proposal, "write_file", task, policy)
+    if "reject" in proposal:
+        return write_out("reject", {"task": task, "reason": proposal["reject"]})
+    rel = proposal["path"]
     out = write_out("proposal", proposal)
     if not policy.get("require_approval", True):
         approve = True
     else:
-        approve = wait_for_approval(out)
+        approve = await wait_for_approval(out)
     if approve:
+        p = safe_path(rel)
         p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(after, encoding="utf-8")
+        p.write_text(task["content"], encoding="utf-8")
         return write_out("applied", {"task": task, "path": rel})
     return write_out("pending", {"task": task, "path": rel})
 
 
-def action_patch_file(task, policy):
-    rel = task["path"]
+async def action_patch_file(task, policy):
     _ = task["diff"]
-    if not is_allowed_path(rel, policy):
-        return write_out("reject", {"task": task, "reason": "path not allowed"})
-    p = safe_path(rel)
-    before = p.read_text(encoding="utf-8") if p.exists() else ""
     # naive display, apply by replacement with provided 'after' if given
-    after = task.get("after")
-    if after is None:
-        return write_out("reject", {"task": task, "reason": "after required for safe patch"})
-    diff = make_diff(before, after, rel)
-    proposal = {"type": "patch_file", "path": rel, "diff": diff}
+    proposal = await offload(compute_proposal, "patch_file", task, policy)
+    if "reject" in proposal:
+        return write_out("reject", {"task": task, "reason": proposal["reject"]})
+    rel = proposal["path"]
     out = write_out("proposal", proposal)
-    approve = wait_for_approval(out) if policy.get("require_approval", True) else True
+    approve = await wait_for_approval(out) if policy.get("require_approval", True) else True
     if approve:
-        p.write_text(after, encoding="utf-8")
+        safe_path(rel).write_text(task["after"], encoding="utf-8")
         return write_out("applied", {"task": task, "path": rel})
     return write_out("pending", {"task": task, "path": rel})
 
 
-def action_run_command(task, policy):
+async def action_run_command(task, policy):
     cmd = task["cmd"]
     base = cmd[0].split()[0]
     if base not in policy.get("allowed_cmds", []):
         return write_out("reject", {"task": task, "reason": "cmd not allowed"})
-    res = run_cmd(cmd)
+    res = await run_cmd(cmd)
     return write_out("command_result", res)
 
 
-def action_restart_bot(_task, _policy):
+async def action_restart_bot(_task, _policy):
     # simple kill & relaunch through a bootstrapper script
     # You can adapt to your VSCode launch or a Windows service later.
     return write_out(
@@ -150,24 +287,62 @@ def action_restart_bot(_task, _policy):
     )
 
 
-def wait_for_approval(proposal_path: Path, timeout_sec: int = 600) -> bool:
+# proposal-Dateiname -> Future mit der Entscheidung (approve true/false)
+_APPROVALS: Dict[str, "asyncio.Future[bool]"] = {}
+# approve*.json, die (noch) nicht lesbar waren oder zu keinem wartenden Vorschlag passten;
+# werden wie frueher beim 2-s-Poll erneut versucht
+_PENDING_APPROVALS: Set[Path] = set()
+APPROVAL_RETRY_SEC = 2.0
+
+
+def handle_approval(ap: Path) -> bool:
+    """Ordnet eine approve*.json einem wartenden Vorschlag zu; True, wenn verbraucht."""
+    try:
+        d = _loads(ap.read_bytes())
+    except FileNotFoundError:
+        _PENDING_APPROVALS.discard(ap)
+        return False
+    except Exception:
+        # evtl. noch halb geschrieben
+        _PENDING_APPROVALS.add(ap)
+        return False
+    fut = _APPROVALS.get(d.get("proposal"))
+    if fut is None or fut.done():
+        _PENDING_APPROVALS.add(ap)
+        return False
+    _PENDING_APPROVALS.discard(ap)
+    fut.set_result(bool(d.get("approve", False)))
+    ap.unlink(missing_ok=True)
+    return True
+
+
+def retry_approvals():
+    for ap in list(_PENDING_APPROVALS):
+        handle_approval(ap)
+
+
+async def retry_pending_loop():
+    while True:
+        await asyncio.sleep(APPROVAL_RETRY_SEC)
+        retry_approvals()
+        retry_tasks()
+
+
+async def wait_for_approval(proposal_path: Path, timeout_sec: int = 600) -> bool:
     """
-    Warte auf agent_inbox/approve.json mit {"proposal":"<filename>", "approve":true}
+    Warte auf agent_inbox/approve*.json mit {"proposal":"<filename>", "approve":true}
     """
-    deadline = time.time() + timeout_sec
     target = proposal_path.name
-    while time.time() < deadline:
-        for ap in INBOX.glob("approve*.json"):
-            try:
-                d = json.loads(ap.read_text(encoding="utf-8"))
-                if d.get("proposal") == target:
-                    ok = bool(d.get("approve", False))
-                    ap.unlink(missing_ok=True)
-                    return ok
-            except Exception:
-                pass
-        time.sleep(2)
-    return False
+    fut = asyncio.get_running_loop().create_future()
+    _APPROVALS[target] = fut
+    # Freigabe kann schon vor dem Vorschlag in der Inbox liegen
+    retry_approvals()
+    try:
+        return await asyncio.wait_for(fut, timeout_sec)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        _APPROVALS.pop(target, None)
 
 
 ACTIONS = {
@@ -179,45 +354,163 @@ ACTIONS = {
 
 
 # ---- Watcher ----
+_RUNNING: Set["asyncio.Task[None]"] = set()
+# Pfad -> geplanter dispatch(); doppelte Events innerhalb DEBOUNCE_SEC werden zusammengefasst
+_DEBOUNCE: Dict[Path, asyncio.TimerHandle] = {}
+DEBOUNCE_SEC = 0.2
+# Task-Dateien, die (noch) nicht lesbar waren: Pfad -> Zeit des ersten Fehlversuchs.
+# Erneut versucht bei jedem modified-Event und im Retry-Loop; nach TASK_PARSE_TIMEOUT_SEC Fehler.
+_PENDING_TASKS: Dict[Path, float] = {}
+TASK_PARSE_TIMEOUT_SEC = 10.0
+# schon gestartete Tasks: spaetere modified-Events derselben Datei starten sie nicht erneut
+_STARTED_TASKS: Set[Path] = set()
+
+
+def _read_task(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        task = _loads(path.read_bytes())
+    except FileNotFoundError:
+        _PENDING_TASKS.pop(path, None)
+        return None
+    except Exception as e:
+        first = _PENDING_TASKS.setdefault(path, time.monotonic())
+        if time.monotonic() - first < TASK_PARSE_TIMEOUT_SEC:
+            return None  # evtl. noch halb geschrieben
+        del _PENDING_TASKS[path]
+        write_out("error", {"file": path.name, "error": str(e), "trace": traceback.format_exc()})
+        return None
+    _PENDING_TASKS.pop(path, None)
+    return task
+
+
+def retry_tasks():
+    for path in list(_PENDING_TASKS):
+        dispatch(path)
+
+
+async def process(path: Path, task: Dict[str, Any]):
+    try:
+        kind = task.get("type")
+        policy = load_policy()
+        if kind in ACTIONS:
+            await ACTIONS[kind](task, policy)
+        else:
+            write_out("reject", {"task": task, "reason": "unknown type"})
+    except Exception as e:
+        write_out("error", {"file": path.name, "error": str(e), "trace": traceback.format_exc()})
+
+
+def dispatch(path: Path):
+    """Neue Inbox-Datei: Freigaben direkt zuordnen, Tasks als eigene asyncio-Task starten."""
+    if not path.name.endswith(".json"):
+        return
+    if path.name.startswith("approve"):
+        handle_approval(path)
+        return
+    if path in _STARTED_TASKS:
+        return
+    task = _read_task(path)
+    if task is None:
+        return
+    _STARTED_TASKS.add(path)
+    t = asyncio.ensure_future(process(path, task))
+    _RUNNING.add(t)
+    t.add_done_callback(_RUNNING.discard)
+
+
+def coalesce(path: Path):
+    h = _DEBOUNCE.pop(path, None)
+    if h is not None:
+        h.cancel()
+    _DEBOUNCE[path] = asyncio.get_running_loop().call_later(DEBOUNCE_SEC, _fire, path)
+
+
+def _fire(path: Path):
+    _DEBOUNCE.pop(path, None)
+    dispatch(path)
+
+
 class InboxHandler(FileSystemEventHandler):
+    """watchdog-Fallback: reicht neue Dateien an die asyncio-Schleife weiter."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
     def on_created(self, event):
         if event.is_directory:
             return
         if not event.src_path.endswith(".json"):
             return
-        time.sleep(0.2)
-        self.process(Path(event.src_path))
+        self.loop.call_soon_threadsafe(coalesce, Path(event.src_path))
 
-    def process(self, path: Path):
-        try:
-            task = json.loads(Path(path).read_text(encoding="utf-8"))
-            kind = task.get("type")
-            policy = load_policy()
-            if kind in ACTIONS:
-                ACTIONS[kind](task, policy)
-            else:
-                write_out("reject", {"task": task, "reason": "unknown type"})
-        except Exception as e:
-            write_out(
-                "error", {"file": path.name, "error": str(e), "trace": traceback.format_exc()}
-            )
+    def on_modified(self, event):
+        # Tasks und Freigaben koennen beim "created"-Event noch unvollstaendig sein
+        if event.is_directory or not event.src_path.endswith(".json"):
+            return
+        self.loop.call_soon_threadsafe(coalesce, Path(event.src_path))
 
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.loop.call_soon_threadsafe(_forget, Path(event.src_path))
+
+
+def _forget(path: Path):
+    # geloeschte Datei: gleicher Name darf spaeter wieder als neuer Task kommen
+    _STARTED_TASKS.discard(path)
+    _PENDING_TASKS.pop(path, None)
+
+
+def _is_approval(path: Path) -> bool:
+    return path.name.startswith("approve") and path.name.endswith(".json")
+
+
+async def watch_inbox():
+    # beim Start schon vorhandene Freigaben einsammeln, danach (wie halb geschriebene Tasks)
+    # periodisch erneut versuchen
+    _PENDING_APPROVALS.update(p for p in INBOX.iterdir() if _is_approval(p))
+    retry = asyncio.ensure_future(retry_pending_loop())
+    try:
+        await _watch_events()
+    finally:
+        retry.cancel()
+
+
+async def _watch_events():
+    if _WATCHFILES_AVAILABLE:
+        async for changes in watchfiles.awatch(INBOX, debounce=200, step=20, recursive=False):
+            for change, src in changes:
+                path = Path(src)
+                if change == watchfiles.Change.deleted:
+                    _forget(path)
+                else:
+                    # added/modified wie im watchdog-Fallback erst nach DEBOUNCE_SEC Ruhe
+                    coalesce(path)
+        return
 
-def main():
-    print("[agent] running… watching", INBOX)
     obs = Observer()
-    h = InboxHandler()
-    obs.schedule(h, str(INBOX), recursive=False)
+    obs.schedule(InboxHandler(asyncio.get_running_loop()), str(INBOX), recursive=False)
     obs.start()
     try:
-        while True:
-            time.sleep(0.5)
-    except KeyboardInterrupt:
-        pass
+        await asyncio.Event().wait()
     finally:
         obs.stop()
         obs.join()
 
 
+def main():
+    global EXECUTOR
+    print("[agent] running… watching", INBOX)
+    # spawn statt fork: der Pool startet Worker erst, wenn Watcher-Threads schon laufen
+    EXECUTOR = ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        asyncio.run(watch_inbox())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        EXECUTOR.shutdown(cancel_futures=True)
+
+
 if __name__ == "__main__":
     main()
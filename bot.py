@@ -4,18 +4,26 @@
 
 import os
 import time
-import json
-import random
+import math
+import heapq
+import operator
+import atexit
+import threading
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
-import pandas as pd
 from dotenv import load_dotenv
 
+from bridge_io import dumps as _dumps
+from event_buffer import EventBuffer
+
 # =============================
 # Bridge-Logger: bevorzugt bot_instrumentation, sonst Fallback
 # =============================
@@ -31,43 +39,36 @@ def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
-def _write_event(dirpath: Path, payload: dict) -> Path:
-    fn = dirpath / f"{_now_ms()}_{random.randrange(1, 1_000_000):06d}.json"
-    with open(fn, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False)
-    return fn
-
+_EVENTS = EventBuffer(EVENTS_DIR)
+atexit.register(_EVENTS.flush_all)
 
-# Versuche offiziellen Logger zu importieren
-try:
-    from bot_instrumentation import (
-        log_trade_open as _log_trade_open,
-        log_trade_close as _log_trade_close,
-        log_equity as _log_equity,
-        log_risk as _log_risk,
-        log_position_snapshot as _log_position_snapshot,
-    )
 
-    def log_trade_open(**kw):
-        return _log_trade_open(**kw)
+def _write_event(kind: str, payload: dict) -> Path:
+    return _EVENTS.append(kind, _dumps(payload) + b"\n")
 
-    def log_trade_close(**kw):
-        return _log_trade_close(**kw)
 
-    def log_equity(v: float):
-        return _log_equity(v)
+# Equity-Events haben immer dieselben Keys: vorgefertigte Byte-Bausteine, nur Zahlen einsetzen
+# (abschaltbar mit BOT_EQUITY_TEMPLATE=0, dann wie alle anderen Events ueber _dumps)
+EQUITY_TEMPLATE = os.getenv("BOT_EQUITY_TEMPLATE", "1") == "1"
+EQUITY_PREFIX = b'{"ts":'
+EQUITY_MID = b',"type":"equity","equity":'
+EQUITY_SUF = b"}\n"
 
-    def log_risk(**kw):
-        return _log_risk(**kw)
-
-    def log_position_snapshot(exposures, avg_leverage):
-        return _log_position_snapshot(exposures, avg_leverage)
 
+# Versuche offiziellen Logger zu importieren (direkt gebunden, ohne Wrapper-Frame)
+try:
+    from bot_instrumentation import (
+        log_trade_open,
+        log_trade_close,
+        log_equity,
+        log_risk,
+        log_position_snapshot,
+    )
 except Exception:
     # Fallback-kompatibel zur Bridge
     def log_trade_open(symbol, side, qty, price, leverage, exchange, strategy_id, rationale):
         return _write_event(
-            EVENTS_DIR / "trades",
+            "trades",
             {
                 "ts": _now_ms(),
                 "type": "trades",
@@ -85,7 +86,7 @@ except Exception:
 
     def log_trade_close(order_ref, symbol, exit_price, profit, pnl_pct, fees=0.0):
         return _write_event(
-            EVENTS_DIR / "trades",
+            "trades",
             {
                 "ts": _now_ms(),
                 "type": "trades",
@@ -100,15 +101,22 @@ except Exception:
         )
 
     def log_equity(equity: float):
-        return _write_event(
-            EVENTS_DIR / "equity", {"ts": _now_ms(), "type": "equity", "equity": equity}
-        )
+        if EQUITY_TEMPLATE and math.isfinite(equity):
+            return _EVENTS.append(
+                "equity",
+                EQUITY_PREFIX
+                + str(_now_ms()).encode()
+                + EQUITY_MID
+                + f"{equity:.6f}".encode()
+                + EQUITY_SUF,
+            )
+        return _write_event("equity", {"ts": _now_ms(), "type": "equity", "equity": equity})
 
     def log_risk(
         open_risk_pct: float, day_pnl_pct: float, rolling_dd_pct: float, mode: str = "normal"
     ):
         return _write_event(
-            EVENTS_DIR / "risk",
+            "risk",
             {
                 "ts": _now_ms(),
                 "type": "risk",
@@ -120,18 +128,21 @@ except Exception:
         )
 
     def log_position_snapshot(exposures, avg_leverage):
-        fn = SNAP_DIR / f"positions_{_now_ms()}_{random.randrange(1, 1_000_000):06d}.json"
-        with open(fn, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "ts": _now_ms(),
-                    "exposures": exposures,
-                    "avg_leverage": avg_leverage,
-                    "paper_capital": float(os.getenv("PAPER_CAPITAL", "10000")),
-                },
-                f,
-                ensure_ascii=False,
-            )
+        # current.json (atomar ersetzt) + Verlauf in history.jsonl
+        data = _dumps(
+            {
+                "ts": _now_ms(),
+                "exposures": exposures,
+                "avg_leverage": avg_leverage,
+                "paper_capital": float(os.getenv("PAPER_CAPITAL", "10000")),
+            }
+        )
+        fn = SNAP_DIR / "current.json"
+        tmp = SNAP_DIR / "current.json.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, fn)
+        with open(SNAP_DIR / "history.jsonl", "ab") as f:
+            f.write(data + b"\n")
         return fn
 
 
@@ -154,11 +165,25 @@ try:
 except Exception:
     _ALPACA_AVAILABLE = False
 
+# ein Client je Fetch-Thread, erst beim ersten Abruf gebaut (haelt seine HTTP-Session warm).
+# Die requests-Session darin ist nicht threadsicher; eigene Clients statt eines globalen Locks,
+# damit Alpaca-Symbole im FETCH_POOL wirklich parallel laufen.
+_ALPACA_LOCAL = threading.local()
+
+
+def _alpaca_client() -> "StockHistoricalDataClient":
+    client = getattr(_ALPACA_LOCAL, "client", None)
+    if client is None:
+        client = _ALPACA_LOCAL.client = StockHistoricalDataClient(ALPACA_KEY, ALPACA_SECRET)
+    return client
+
+
 # Handelssymbole & Strategie-Parameter
 CFG = {
     "symbols": {"bitget": ["BTCUSDT"], "alpaca": ["SPY"]},
     "timeframe": "1m",
     "hist_bars": 200,
+    "update_bars": 3,  # je Minute nachgeladene Kerzen (muss mit dem letzten Stand ueberlappen)
     "sma_fast": 9,
     "sma_slow": 21,
     "atr_len": 14,
@@ -174,126 +199,243 @@ MAX_DD_LIMIT = 8.0  # %
 DAY_LOSS_LIMIT = -3.0  # %
 
 
-# =============================
-# Indikator-Helfer
-# =============================
-def sma(series: pd.Series, n: int) -> pd.Series:
-    return series.rolling(window=n, min_periods=n).mean()
-
-
-def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int) -> pd.Series:
-    prev_close = close.shift(1)
-    tr = pd.concat([(high - low), (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(
-        axis=1
-    )
-    return tr.rolling(window=n, min_periods=n).mean()
-
-
 # =============================
 # Datenquellen
 # =============================
+# Kerzen als NumPy-Structured-Array (ein Block statt DataFrame je Abruf)
+BAR_DTYPE = np.dtype([("ts", "i8"), ("open", "f8"), ("high", "f8"), ("low", "f8"), ("close", "f8")])
+
 BITGET_CANDLES_ENDPOINTS = [
     "https://api.bitget.com/api/spot/v1/market/candles",
     "https://api.bitget.com/api/mix/v1/market/candles",
 ]
 
+# Eine Session fuer alle Bitget-Calls: Keep-Alive + Connection-Pool statt TCP/TLS-Handshake je Call
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+SESSION.headers["Connection"] = "keep-alive"
+
+
+def _bitget_rows(data):
+    for row in data:
+        try:
+            ts_raw = float(row[0])
+            ts = int(ts_raw / 1000) if ts_raw > 1e10 else int(ts_raw)
+            yield ts, float(row[1]), float(row[2]), float(row[3]), float(row[4])
+        except Exception:
+            continue
+
 
 def get_bitget_candles(
     symbol: str, granularity_sec: int = 60, limit: int = 200
-) -> Optional[pd.DataFrame]:
-    params = {"symbol": symbol, "granularity": granularity_sec}
+) -> Optional[np.ndarray]:
+    params = {"symbol": symbol, "granularity": granularity_sec, "limit": limit}
     for url in BITGET_CANDLES_ENDPOINTS:
         try:
-            r = requests.get(url, params=params, timeout=6)
+            r = SESSION.get(url, params=params, timeout=6)
             if r.status_code != 200:
                 continue
             data = r.json().get("data")
             if not data:
                 continue
-            rows = []
-            for row in data:
-                try:
-                    ts_raw = float(row[0])
-                    ts = int(ts_raw / 1000) if ts_raw > 1e10 else int(ts_raw)
-                    o, h, low, c = float(row[1]), float(row[2]), float(row[3]), float(row[4])
-                    rows.append((ts, o, h, low, c))
-                except Exception:
-                    continue
-            if not rows:
+            arr = np.fromiter(_bitget_rows(data), dtype=BAR_DTYPE)
+            if not len(arr):
                 continue
-            df = pd.DataFrame(rows, columns=["ts", "open", "high", "low", "close"]).sort_values(
-                "ts"
-            )
-            if len(df) > limit:
-                df = df.iloc[-limit:]
-            return df
+            arr.sort(order="ts")
+            return arr[-limit:]
         except Exception:
             continue
     return None
 
 
-def get_alpaca_bars(symbol: str, limit: int = 200) -> Optional[pd.DataFrame]:
+def get_alpaca_bars(
+    symbol: str, limit: int = 200, since_ts: Optional[int] = None
+) -> Optional[np.ndarray]:
+    """None bei Fehler; leeres Array, wenn im Fenster keine Kerzen liegen (Markt zu)."""
     if not _ALPACA_AVAILABLE:
         return None
     try:
-        client = StockHistoricalDataClient(ALPACA_KEY, ALPACA_SECRET)
-        end_dt = datetime.utcnow().replace(tzinfo=timezone.utc)
-        start_dt = end_dt - timedelta(minutes=limit * 3)
+        end_dt = datetime.now(timezone.utc)
+        if since_ts is not None:
+            # Update: ab der letzten bekannten Kerze, egal wie lange der Markt ruhig war
+            start_dt = datetime.fromtimestamp(since_ts, timezone.utc)
+        else:
+            start_dt = end_dt - timedelta(minutes=limit * 3)
+        # ohne limit: Alpaca wuerde die aeltesten Kerzen im Fenster liefern, gekuerzt wird unten
         req = StockBarsRequest(
             symbol_or_symbols=symbol,
             timeframe=TimeFrame.Minute,
             start=start_dt,
             end=end_dt,
-            limit=limit,
         )
-        bars = client.get_stock_bars(req)
+        bars = _alpaca_client().get_stock_bars(req)
         if symbol not in bars:
-            return None
-        recs = []
-        for bar in bars[symbol]:
-            ts = int(bar.timestamp.timestamp())
-            recs.append((ts, float(bar.open), float(bar.high), float(bar.low), float(bar.close)))
-        if not recs:
-            return None
-        df = pd.DataFrame(recs, columns=["ts", "open", "high", "low", "close"]).sort_values("ts")
-        if len(df) > limit:
-            df = df.iloc[-limit:]
-        return df
+            return np.empty(0, dtype=BAR_DTYPE)
+        arr = np.fromiter(
+            ((int(b.timestamp.timestamp()), b.open, b.high, b.low, b.close) for b in bars[symbol]),
+            dtype=BAR_DTYPE,
+        )
+        arr.sort(order="ts")
+        return arr[-limit:]
     except Exception:
         return None
 
 
 # =============================
-# Signale
+# Inkrementelle Indikatoren (je Symbol)
 # =============================
-def signal_from_bars(df: pd.DataFrame, fast: int, slow: int) -> Optional[str]:
-    if df is None or len(df) < max(fast, slow) + 2:
-        return None
-    closes = pd.Series(df["close"].values)
-    f = sma(closes, fast)
-    s = sma(closes, slow)
-    if f.isna().any() or s.isna().any():
+class IndicatorState:
+    """Laufende SMA-Summen + ATR-Fenster; jede neue Kerze kostet O(1) statt Neuberechnung."""
+
+    def __init__(self, fast: int, slow: int, atr_len: int):
+        self.fast = fast
+        self.slow = slow
+        self.atr_len = atr_len
+        self.closes: Deque[float] = deque(maxlen=max(fast, slow) + 1)
+        self.trs: Deque[float] = deque(maxlen=atr_len)
+        self.sum_fast = 0.0
+        self.sum_slow = 0.0
+        self.sum_tr = 0.0
+        self.prev_sma: Optional[Tuple[float, float]] = None
+        self.last_ts: Optional[int] = None
+        self.count = 0
+
+    @property
+    def last_close(self) -> Optional[float]:
+        return self.closes[-1] if self.closes else None
+
+    def _true_range(self, h: float, low: float) -> float:
+        # Vorschlusskurs = vorletzter Eintrag (die aktuelle Kerze steht schon in closes)
+        if len(self.closes) < 2:
+            return h - low
+        pc = self.closes[-2]
+        return max(h - low, abs(h - pc), abs(low - pc))
+
+    def _push(self, ts: int, h: float, low: float, c: float):
+        closes = self.closes
+        n = len(closes)
+        full = n >= max(self.fast, self.slow)
+        self.prev_sma = (self.sum_fast / self.fast, self.sum_slow / self.slow) if full else None
+        if n >= self.fast:
+            self.sum_fast -= closes[-self.fast]
+        if n >= self.slow:
+            self.sum_slow -= closes[-self.slow]
+        closes.append(c)
+        self.sum_fast += c
+        self.sum_slow += c
+        tr = self._true_range(h, low)
+        if len(self.trs) == self.atr_len:
+            self.sum_tr -= self.trs[0]
+        self.trs.append(tr)
+        self.sum_tr += tr
+        self.last_ts = ts
+        self.count += 1
+
+    def _replace_last(self, h: float, low: float, c: float):
+        # laufende (noch offene) Kerze wurde aktualisiert: nur Deltas verrechnen
+        delta = c - self.closes[-1]
+        self.closes[-1] = c
+        self.sum_fast += delta
+        self.sum_slow += delta
+        tr = self._true_range(h, low)
+        self.sum_tr += tr - self.trs[-1]
+        self.trs[-1] = tr
+
+    def update(self, bars: np.ndarray) -> bool:
+        """Neue Kerzen einspielen; False, wenn zum letzten Stand Kerzen fehlen (neu laden)."""
+        if not len(bars):
+            return True
+        if self.last_ts is not None and bars["ts"][0] > self.last_ts:
+            return False
+        for t, h, low, c in zip(
+            bars["ts"].tolist(), bars["high"].tolist(), bars["low"].tolist(), bars["close"].tolist()
+        ):
+            if self.last_ts is None or t > self.last_ts:
+                self._push(t, h, low, c)
+            elif t == self.last_ts:
+                self._replace_last(h, low, c)
+        return True
+
+    def signal(self) -> Optional[str]:
+        if self.prev_sma is None:
+            return None
+        f_prev, s_prev = self.prev_sma
+        f_curr, s_curr = self.sum_fast / self.fast, self.sum_slow / self.slow
+        if f_prev <= s_prev and f_curr > s_curr:
+            return "long"
+        if f_prev >= s_prev and f_curr < s_curr:
+            return "short"
         return None
-    f_prev, f_curr = f.iloc[-2], f.iloc[-1]
-    s_prev, s_curr = s.iloc[-2], s.iloc[-1]
-    if f_prev <= s_prev and f_curr > s_curr:
-        return "long"
-    if f_prev >= s_prev and f_curr < s_curr:
-        return "short"
-    return None
 
+    def atr(self) -> Optional[float]:
+        if self.count < self.atr_len + 1:
+            return None
+        return self.sum_tr / self.atr_len
+
+
+STATES: Dict[str, IndicatorState] = {}  # key = venue:symbol
+
+
+def fetch_bars(
+    venue: str, symbol: str, limit: int, since_ts: Optional[int] = None
+) -> Optional[np.ndarray]:
+    if venue == "bitget":
+        return get_bitget_candles(symbol, granularity_sec=60, limit=limit)
+    return get_alpaca_bars(symbol, limit=limit, since_ts=since_ts)
 
-def last_atr(df: pd.DataFrame, n: int) -> Optional[float]:
-    if df is None or len(df) < n + 1:
+
+def refresh_state(venue: str, symbol: str) -> Optional[IndicatorState]:
+    """Nur die letzten Kerzen nachladen; volle Historie nur beim Start oder nach einer Luecke."""
+    key = f"{venue}:{symbol}"
+    state = STATES.get(key)
+    if state is not None:
+        df = fetch_bars(venue, symbol, CFG["update_bars"], since_ts=state.last_ts)
+        # Abruf fehlgeschlagen: kein (veralteter) Kurs fuer MTM/Exits, Zustand bleibt erhalten
+        if df is None:
+            return None
+        # keine neuen Kerzen (Markt zu, ruhige Minute): letzter Schlusskurs bleibt gueltig
+        if state.update(df):
+            return state
+    df = fetch_bars(venue, symbol, CFG["hist_bars"])
+    if df is None or not len(df):
         return None
-    a = atr(pd.Series(df["high"]), pd.Series(df["low"]), pd.Series(df["close"]), n).iloc[-1]
-    return None if np.isnan(a) else float(a)
+    state = IndicatorState(CFG["sma_fast"], CFG["sma_slow"], CFG["atr_len"])
+    state.update(df)
+    STATES[key] = state
+    return state
+
+
+# HTTP-Wartezeit ueberlappen: Dauer = langsamstes Symbol statt Summe aller Symbole
+FETCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fetch")
+
+
+def refresh_all() -> Dict[str, Optional[IndicatorState]]:
+    jobs = {
+        f"{venue}:{sym}": FETCH_POOL.submit(refresh_state, venue, sym)
+        for venue in ("bitget", "alpaca")
+        for sym in CFG["symbols"][venue]
+    }
+    return {k: job.result() for k, job in jobs.items()}
 
 
 # =============================
 # Position & Portfolio
 # =============================
 class Position:
+    __slots__ = (
+        "symbol",
+        "venue",
+        "side",
+        "entry",
+        "qty",
+        "atr",
+        "rationale",
+        "open_ts",
+        "stop",
+        "tp",
+        "breakeven_armed",
+    )
+
     def __init__(
         self,
         symbol: str,
@@ -364,11 +506,13 @@ class Position:
 
 
 class Portfolio:
+    __slots__ = ("equity", "peak", "max_dd", "day_start_date", "day_start_eq", "positions")
+
     def __init__(self, start_eq: float):
         self.equity = float(start_eq)
         self.peak = float(start_eq)
         self.max_dd = 0.0
-        self.day_start_date = datetime.utcnow().date()
+        self.day_start_date = int(time.time() // 86400)  # UTC-Tagesnummer
         self.day_start_eq = float(start_eq)
         self.positions: Dict[str, Position] = {}  # key = venue:symbol
 
@@ -379,7 +523,7 @@ class Portfolio:
         base = max(1e-9, self.day_start_eq)
         return (self.equity - base) / base * 100.0
 
-    def mark_to_market(self, prices: Dict[str, float]):
+    def mark_to_market(self, prices: Dict[str, float], now: float):
         total = 0.0
         for k, pos in self.positions.items():
             px = prices.get(k)
@@ -391,8 +535,9 @@ class Portfolio:
         if self.peak > 0:
             dd = (self.peak - self.equity) / self.peak * 100.0
             self.max_dd = max(self.max_dd, dd)
-        if datetime.utcnow().date() != self.day_start_date:
-            self.day_start_date = datetime.utcnow().date()
+        today = int(now // 86400)
+        if today != self.day_start_date:
+            self.day_start_date = today
             self.day_start_eq = self.equity
 
     def open_position(self, venue, symbol, side, entry, atr_val, rationale):
@@ -453,40 +598,36 @@ class Portfolio:
         log_position_snapshot(exposures, avg_leverage=1.0)
 
     def worst_offenders(self, prices: Dict[str, float], topn: int = 2) -> List[Tuple[str, float]]:
-        # sortiere nach größtem negativen unrealized PnL
-        losses = []
-        for k, pos in self.positions.items():
-            px = prices.get(k)
-            if px is None:
-                continue
-            pnl = pos.mtm(px)
-            losses.append((k, pnl))
-        losses.sort(key=lambda t: t[1])  # am negativsten zuerst
-        return losses[:topn]
+        # die topn groessten negativen unrealized PnL (am negativsten zuerst), O(N log topn)
+        return heapq.nsmallest(
+            topn,
+            ((k, pos.mtm(prices[k])) for k, pos in self.positions.items() if k in prices),
+            key=operator.itemgetter(1),
+        )
 
 
 # =============================
 # Utils
 # =============================
 def align_to_next_minute():
-    now = datetime.utcnow()
-    sleep = 60 - (now.second + now.microsecond / 1e6)
+    sleep = 60 - time.time() % 60
     if sleep > 0:
         time.sleep(sleep)
 
 
-def write_alert(kind: str, status: dict, offenders: List[Tuple[str, float]], tuning: dict):
+def write_alert(
+    kind: str, status: dict, offenders: List[Tuple[str, float]], tuning: dict, now: float
+):
     alert = {
-        "ts": _now_ms(),
-        "when": datetime.utcnow().isoformat() + "Z",
+        "ts": int(now * 1000),
+        "when": datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat() + "Z",
         "kind": kind,
         "status": status,
         "offenders": [{"key": k, "unrealized_pnl": pnl} for k, pnl in offenders],
         "tuning": tuning,
     }
     fn = REPORTS_DIR / f"alert_{alert['ts']}.json"
-    with open(fn, "w", encoding="utf-8") as f:
-        json.dump(alert, f, ensure_ascii=False, indent=2)
+    fn.write_bytes(_dumps(alert, indent=True))
     print("[ALERT]", kind, "->", fn)
 
 
@@ -502,21 +643,26 @@ def main():
     pause_new_entries = False
 
     while True:
-        loop_start = time.time()
+        # Takt ueber monotonic (NTP-Spruenge egal); Wall-Clock nur fuer Tagesgrenze/Zeitstempel
+        loop_start = time.monotonic()
+        now = time.time()
         prices: Dict[str, float] = {}
 
         try:
+            # alle Symbole parallel laden, danach sequentiell auswerten
+            states = refresh_all()
+
             # --- Bitget ---
             for sym in CFG["symbols"]["bitget"]:
-                df = get_bitget_candles(sym, granularity_sec=60, limit=CFG["hist_bars"])
-                last_px = float(df["close"].iloc[-1]) if (df is not None and len(df)) else None
+                state = states[f"bitget:{sym}"]
+                last_px = state.last_close if state is not None else None
                 if last_px is not None:
                     prices[f"bitget:{sym}"] = last_px
                 if last_px is not None:
                     portfolio.maybe_exit("bitget", sym, last_px)
-                if not pause_new_entries and df is not None:
-                    sig = signal_from_bars(df, CFG["sma_fast"], CFG["sma_slow"])
-                    a = last_atr(df, CFG["atr_len"])
+                if not pause_new_entries and state is not None:
+                    sig = state.signal()
+                    a = state.atr()
                     if (
                         sig
                         and a
@@ -528,15 +674,15 @@ def main():
 
             # --- Alpaca ---
             for sym in CFG["symbols"]["alpaca"]:
-                df = get_alpaca_bars(sym, limit=CFG["hist_bars"])
-                last_px = float(df["close"].iloc[-1]) if (df is not None and len(df)) else None
+                state = states[f"alpaca:{sym}"]
+                last_px = state.last_close if state is not None else None
                 if last_px is not None:
                     prices[f"alpaca:{sym}"] = last_px
                 if last_px is not None:
                     portfolio.maybe_exit("alpaca", sym, last_px)
-                if not pause_new_entries and df is not None:
-                    sig = signal_from_bars(df, CFG["sma_fast"], CFG["sma_slow"])
-                    a = last_atr(df, CFG["atr_len"])
+                if not pause_new_entries and state is not None:
+                    sig = state.signal()
+                    a = state.atr()
                     if (
                         sig
                         and a
@@ -547,7 +693,7 @@ def main():
                         portfolio.open_position("alpaca", sym, sig, last_px, a, rationale)
 
             # Mark-to-market & Logs
-            portfolio.mark_to_market(prices)
+            portfolio.mark_to_market(prices, now)
             portfolio.snapshot_logs(prices)
 
             # ===== Integrierter Risikowächter =====
@@ -579,6 +725,7 @@ def main():
                     {"day_pnl_pct": day_pnl, "max_drawdown_pct": max_dd},
                     offenders,
                     tuning,
+                    now,
                 )
             else:
                 # Wenn entspannt: Pause wieder aufheben
@@ -592,7 +739,7 @@ def main():
             traceback.print_exc()
 
         # auf 1-Minutentakt synchronisieren
-        elapsed = time.time() - loop_start
+        elapsed = time.monotonic() - loop_start
         time.sleep(max(1.0, 60.0 - elapsed))
 
 
@@ -1,10 +1,14 @@
 # bot_instrumentation.py
+import atexit
 import json
 import os
 import time
-import uuid
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Literal
+
+from pydantic import BaseModel, TypeAdapter
+
+from event_buffer import EventBuffer
 
 BRIDGE_OUT = Path(os.getenv("BRIDGE_OUT", "bridge_out"))
 EVENTS_DIR = BRIDGE_OUT / "events"
@@ -22,13 +26,69 @@ def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
-def _write_event(kind: str, payload: Dict[str, Any]) -> Path:
-    ts = _now_ms()
-    fn = EVENTS_DIR / kind / f"{ts}_{uuid.uuid4().hex}.json"
-    payload = {"ts": ts, "type": kind, **payload}
-    with open(fn, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False)
-    return fn
+_BUFFER = EventBuffer(EVENTS_DIR)
+atexit.register(_BUFFER.flush_all)
+
+
+def flush_all():
+    _BUFFER.flush_all()
+
+
+# --- Event-Modelle: Serialisierung ueber den kompilierten pydantic-core-Serializer ---
+
+
+class TradeOpenEvt(BaseModel):
+    ts: int
+    type: Literal["trades"] = "trades"
+    event: Literal["open"] = "open"
+    symbol: str
+    side: str  # "long" | "short"
+    qty: float
+    price: float
+    leverage: float
+    exchange: str  # "alpaca" | "bitget"
+    strategy_id: str
+    rationale: str
+
+
+class TradeCloseEvt(BaseModel):
+    ts: int
+    type: Literal["trades"] = "trades"
+    event: Literal["close"] = "close"
+    order_ref: str
+    symbol: str
+    exit_price: float
+    profit: float
+    pnl_pct: float
+    fees: float = 0.0
+
+
+class EquityEvt(BaseModel):
+    ts: int
+    type: Literal["equity"] = "equity"
+    equity: float
+
+
+class RiskEvt(BaseModel):
+    ts: int
+    type: Literal["risk"] = "risk"
+    open_risk_pct: float
+    day_pnl_pct: float
+    rolling_dd_pct: float
+    mode: str = "normal"  # normal | defensive | ultra_defensive
+
+
+# einmal beim Import gebaut; dump_json liefert direkt bytes fuer den JSONL-Puffer
+_ADAPTERS: Dict[str, TypeAdapter] = {
+    "trades_open": TypeAdapter(TradeOpenEvt),
+    "trades_close": TypeAdapter(TradeCloseEvt),
+    "equity": TypeAdapter(EquityEvt),
+    "risk": TypeAdapter(RiskEvt),
+}
+
+
+def _write_event(kind: str, adapter: str, evt: BaseModel) -> Path:
+    return _BUFFER.append(kind, _ADAPTERS[adapter].dump_json(evt) + b"\n")
 
 
 # --- Trades ---
@@ -44,71 +104,71 @@ def log_trade_open(
     strategy_id: str,
     rationale: str,
 ) -> Path:
-    return _write_event(
-        "trades",
-        {
-            "event": "open",
-            "symbol": symbol,
-            "side": side,  # "long" | "short"
-            "qty": qty,
-            "price": price,
-            "leverage": leverage,
-            "exchange": exchange,  # "alpaca" | "bitget"
-            "strategy_id": strategy_id,
-            "rationale": rationale,
-        },
+    evt = TradeOpenEvt(
+        ts=_now_ms(),
+        symbol=symbol,
+        side=side,
+        qty=qty,
+        price=price,
+        leverage=leverage,
+        exchange=exchange,
+        strategy_id=strategy_id,
+        rationale=rationale,
     )
+    return _write_event("trades", "trades_open", evt)
 
 
 def log_trade_close(
     order_ref: str, symbol: str, exit_price: float, profit: float, pnl_pct: float, fees: float = 0.0
 ) -> Path:
-    return _write_event(
-        "trades",
-        {
-            "event": "close",
-            "order_ref": order_ref,
-            "symbol": symbol,
-            "exit_price": exit_price,
-            "profit": profit,
-            "pnl_pct": pnl_pct,
-            "fees": fees,
-        },
+    evt = TradeCloseEvt(
+        ts=_now_ms(),
+        order_ref=order_ref,
+        symbol=symbol,
+        exit_price=exit_price,
+        profit=profit,
+        pnl_pct=pnl_pct,
+        fees=fees,
     )
+    return _write_event("trades", "trades_close", evt)
 
 
 # --- Equity & Risiko ---
 
 
 def log_equity(equity: float) -> Path:
-    return _write_event("equity", {"equity": equity})
+    return _write_event("equity", "equity", EquityEvt(ts=_now_ms(), equity=equity))
 
 
 def log_risk(
     open_risk_pct: float, day_pnl_pct: float, rolling_dd_pct: float, mode: str = "normal"
 ) -> Path:
-    return _write_event(
-        "risk",
-        {
-            "open_risk_pct": open_risk_pct,
-            "day_pnl_pct": day_pnl_pct,
-            "rolling_dd_pct": rolling_dd_pct,
-            "mode": mode,  # normal | defensive | ultra_defensive
-        },
+    evt = RiskEvt(
+        ts=_now_ms(),
+        open_risk_pct=open_risk_pct,
+        day_pnl_pct=day_pnl_pct,
+        rolling_dd_pct=rolling_dd_pct,
+        mode=mode,
     )
+    return _write_event("risk", "risk", evt)
 
 
 # --- Snapshots (z. B. Exposure je Asset) ---
 
 
 def log_position_snapshot(exposures: List[Dict[str, Any]], avg_leverage: float) -> Path:
-    fn = SNAP_DIR / f"positions_{_now_ms()}_{uuid.uuid4().hex}.json"
+    # aktueller Stand in current.json (atomar ersetzt), Verlauf als eine Zeile in history.jsonl
     snap = {
         "ts": _now_ms(),
         "exposures": exposures,  # [ {symbol, direction, notional_eur, risk_pct} ]
         "avg_leverage": avg_leverage,
         "paper_capital": PAPER_CAPITAL,
     }
-    with open(fn, "w", encoding="utf-8") as f:
-        json.dump(snap, f, ensure_ascii=False)
+    data = json.dumps(snap, ensure_ascii=False).encode("utf-8")
+    fn = SNAP_DIR / "current.json"
+    tmp = SNAP_DIR / "current.json.tmp"
+    tmp.write_bytes(data)
+    os.replace(tmp, fn)
+    with open(SNAP_DIR / "history.jsonl", "ab") as f:
+        f.write(data + b"\n")
     return fn
@@ -0,0 +1,107 @@
+# bridge_io.py — gemeinsame JSON-/Datei-Helfer fuer Bot, Bridge, Guard, Dashboard und Agent-Service
+# Nur optionale Abhaengigkeiten (orjson, watchfiles); ohne sie greifen stdlib bzw. Sleep-Loops.
+import json
+import os
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+# orjson (Rust) fuer Events/Snapshots/Status/Inbox, sonst stdlib json
+try:
+    import orjson
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        opt = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=opt)
+
+    loads = orjson.loads
+except ImportError:
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+    loads = json.loads
+
+# watchfiles (Rust/notify, inotify unter Linux): aufwachen nur bei Aenderungen, sonst Sleep-Loop
+try:
+    import watchfiles
+
+    WATCHFILES_AVAILABLE = True
+except Exception:
+    watchfiles = None
+    WATCHFILES_AVAILABLE = False
+
+
+def read_json(path: Any) -> Any:
+    # os.open/os.read auf dem Pfad-String: kein Path- und kein Buffered-File-Objekt je Datei
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return loads(os.read(fd, os.fstat(fd).st_size))
+    finally:
+        os.close(fd)
+
+
+# klein: gedacht fuer wiederholt gelesene Dateien (current.json, status.json, Snapshots);
+# Event-Dateien werden dank Cursor nur einmal gelesen und gehen direkt ueber read_json
+@lru_cache(maxsize=128)
+def _parse(path_str: str, stamp: Tuple[int, int, int]) -> Any:
+    # Ergebnis wird geteilt -> Aufrufer veraendern die Dicts nicht.
+    return read_json(path_str)
+
+
+def load_cached(path: Any) -> Any:
+    """JSON-Datei lesen; unveraenderte Dateien werden je Prozess nur einmal geparst.
+
+    Key ist (Pfad, mtime/Groesse/Inode); die Inode faengt current.json ab, das per os.replace
+    ersetzt wird, auch innerhalb eines mtime-Ticks.
+    """
+    st = os.stat(path)
+    return _parse(str(path), (st.st_mtime_ns, st.st_size, st.st_ino))
+
+
+# Blockgroesse fuer das Rueckwaerts-Lesen von JSONL-Dateien
+TAIL_BLOCK = 64 * 1024
+
+
+def read_jsonl_tail(path: Any, since_ms: int = 0, limit: Optional[int] = None) -> List[Any]:
+    """Juengste Zeilen einer nach ts angehaengten JSONL-Datei, in Dateireihenfolge.
+
+    Liest blockweise vom Dateiende rueckwaerts und hoert beim ersten Event mit ts < since_ms
+    bzw. nach limit Events auf - Kosten O(Fenster) statt O(Datei). Eine letzte Zeile ohne
+    "\\n" wird noch geschrieben und uebersprungen.
+    """
+    rows: List[Any] = []
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return rows
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        carry = b""
+        first = True
+        while pos > 0 and (limit is None or len(rows) < limit):
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + carry).split(b"\n")
+            if first:
+                # Rest nach dem letzten "\n" (leer oder unvollstaendig) verwerfen
+                lines.pop()
+                if not lines:
+                    carry = b""
+                    continue
+                first = False
+            # erste Zeile beginnt evtl. im davorliegenden Block
+            carry = lines.pop(0) if pos > 0 else b""
+            for line in reversed(lines):
+                if not line:
+                    continue
+                try:
+                    row = loads(line)
+                except Exception:
+                    continue
+                if int(row.get("ts", 0)) < since_ms:
+                    return rows[::-1]
+                rows.append(row)
+                if limit is not None and len(rows) >= limit:
+                    break
+    return rows[::-1]
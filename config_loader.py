@@ -1,10 +1,17 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# C-Parser (libyaml), falls PyYAML damit gebaut ist
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 class Risk(BaseModel):
+    # unveraenderlich (gecachte Instanz wird geteilt); Tippfehler in der YAML fallen auf
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     risk_per_trade_pct: float = Field(0.005, ge=0.0, le=0.05)
     max_drawdown_pct: float = Field(8.0, gt=0.0, le=80.0)
     day_loss_limit_pct: float = Field(-3.0, lt=0.0)
@@ -17,9 +24,23 @@ class AppConfig(BaseModel):
     risk: Risk = Risk()
 
 
-def load_config(path: Path = Path("config/config.yaml")) -> AppConfig:
+# einmal beim Import gebauter Validator statt Attribut-Lookup je Aufruf
+_VALIDATOR = AppConfig.__pydantic_validator__
+
+
+@lru_cache(maxsize=4)
+def _load_config_cached(path_str: str, mtime_ns: int) -> AppConfig:
     data: Dict[str, Any] = {}
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-    return AppConfig.model_validate(data)
+    if mtime_ns >= 0:
+        with open(path_str, "r", encoding="utf-8") as f:
+            data = yaml.load(f, Loader=_YAML_LOADER) or {}
+    return _VALIDATOR.validate_python(data)
+
+
+def load_config(path: Path = Path("config/config.yaml")) -> AppConfig:
+    # Cache-Key (Pfad, mtime): geaenderte Datei wird automatisch neu gelesen
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = -1
+    return _load_config_cached(str(path), mtime_ns)
@@ -1,11 +1,24 @@
 import argparse
-import csv
-import json
+import io
 import os
 import subprocess
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from bridge_io import WATCHFILES_AVAILABLE as _WATCHFILES_AVAILABLE, watchfiles
+from bridge_io import dumps as _dumps, load_cached as _load_cached, loads as _loads, read_json
+
+# libgit2-Bindings: init/add/commit ohne fork+exec je Aufruf, sonst git-CLI
+try:
+    import pygit2
+
+    _PYGIT2_AVAILABLE = True
+except Exception:
+    _PYGIT2_AVAILABLE = False
 
 BRIDGE_OUT = Path(os.getenv("BRIDGE_OUT", "bridge_out"))
 EVENTS_DIR = BRIDGE_OUT / "events"
@@ -16,90 +29,291 @@ for p in [EVENTS_DIR / "trades", EVENTS_DIR / "risk", EVENTS_DIR / "equity", REP
     p.mkdir(parents=True, exist_ok=True)
 
 PAPER_CAPITAL = float(os.getenv("PAPER_CAPITAL", "10000"))
+# eventgetrieben kann publish_status oft laufen -> Git-Push hoechstens alle N Sekunden
+GIT_MIN_INTERVAL = float(os.getenv("COOP_GIT_MIN_INTERVAL", "60"))
+# status.json nur auf Wunsch eingerueckt (menschenlesbar); sonst kompakt
+BRIDGE_PRETTY = os.getenv("BRIDGE_PRETTY", "0") == "1"
+_last_git_publish = float("-inf")
 
 # --- Utils ---
 
 
-def _read_json_files(path: Path) -> List[Dict[str, Any]]:
+def _json_names(path: Path, prefix: str = "") -> List[str]:
+    # nur Dateinamen (keine Path-Objekte, kein stat je Datei); fehlendes Verzeichnis = leer
+    try:
+        with os.scandir(path) as it:
+            return [e.name for e in it if e.name.startswith(prefix) and e.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+
+
+def _latest_json_name(path: Path, prefix: str) -> Optional[str]:
+    # neueste Datei per max() in einem Durchlauf statt komplett zu sortieren
+    try:
+        with os.scandir(path) as it:
+            return max(
+                (e.name for e in it if e.name.startswith(prefix) and e.name.endswith(".json")),
+                default=None,
+            )
+    except FileNotFoundError:
+        return None
+
+
+def _read_jsonl_from(fn: Path, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """Vollstaendige Zeilen ab Byte-Offset; liefert (items, neuer Offset)."""
+    items: List[Dict[str, Any]] = []
+    try:
+        with open(fn, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # letzte Zeile wird noch geschrieben
+                offset += len(line)
+                try:
+                    items.append(_loads(line))
+                except Exception:
+                    pass
+    except FileNotFoundError:
+        pass
+    return items, offset
+
+
+def _read_jsonl(fn: Path) -> List[Dict[str, Any]]:
+    return _read_jsonl_from(fn)[0]
+
+
+# ab so vielen neuen Einzeldateien (Kaltstart) wird ueber alle Kerne geparst
+PARALLEL_MIN_FILES = 1000
+PARSE_CHUNK = 256
+
+
+def _parse_chunk(paths: List[str]) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
-    for fn in sorted(path.glob("*.json")):
+    for p in paths:
         try:
-            with open(fn, "r", encoding="utf-8") as f:
-                items.append(json.load(f))
+            items.append(read_json(p))
         except Exception:
             pass
     return items
 
 
+def _parse_files(path: Path, names: List[str]) -> List[Dict[str, Any]]:
+    paths = [os.path.join(path, n) for n in names]
+    if len(paths) <= PARALLEL_MIN_FILES:
+        # kleine Deltas bleiben im Prozess (kein Start-Overhead fuer Worker)
+        return _parse_chunk(paths)
+    chunks = [paths[i : i + PARSE_CHUNK] for i in range(0, len(paths), PARSE_CHUNK)]
+    with ProcessPoolExecutor() as ex:
+        return [d for part in ex.map(_parse_chunk, chunks) for d in part]
+
+
+def _read_json_files(path: Path) -> List[Dict[str, Any]]:
+    """Einzeldateien <path>/*.json (Altformat) plus <path>.jsonl, nach ts sortiert."""
+    items = _parse_files(path, sorted(_json_names(path)))
+    items += _read_jsonl(path.with_suffix(".jsonl"))
+    items.sort(key=lambda d: int(d.get("ts", 0)))
+    return items
+
+
+# Altformat: Dateien, deren Name-ts bis zu so viele ms hinter dem neuesten verarbeiteten liegt
+# (Uhrsprung, zweiter Schreiber), werden noch nachgelesen; aeltere Nachzuegler gelten als gelesen
+LEGACY_LATE_MS = 10 * 60 * 1000
+
+
+def _name_key(name: str) -> Tuple[int, str]:
+    # Altformat-Dateinamen beginnen mit dem ts ("<ts_ms>_<...>.json"): numerisch nach ts ordnen
+    try:
+        return int(name.split("_", 1)[0]), name
+    except ValueError:
+        return 0, name
+
+
+def _read_new_events(path: Path, cursor: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Wie _read_json_files, aber nur Events nach dem Cursor; der Cursor wird fortgeschrieben.
+
+    Altformat: groesster verarbeiteter Name (last_file) plus die verarbeiteten Namen aus den
+    letzten LEGACY_LATE_MS davor (recent) - der Zustand bleibt klein, ein verspaeteter Name
+    vor last_file wird trotzdem gelesen.
+    JSONL: Byte-Offset der letzten vollstaendigen Zeile.
+    """
+    all_names = _json_names(path)
+    last = _name_key(cursor.get("last_file", ""))
+    if "recent" in cursor:
+        recent = set(cursor["recent"])
+    else:
+        # Zustand aus aelterer Version: Liste "seen" bzw. alles bis last_file gilt als gelesen
+        seen = cursor.pop("seen", None)
+        if seen:
+            last = max(last, *map(_name_key, seen))
+        recent = set(seen) if seen is not None else {n for n in all_names if _name_key(n) <= last}
+    horizon = last[0] - LEGACY_LATE_MS
+    keys = sorted(
+        k for k in map(_name_key, all_names) if k > last or (k[1] not in recent and k[0] >= horizon)
+    )
+    names = [n for _, n in keys]
+    items = _parse_files(path, names)
+    if keys:
+        recent.update(names)
+        last = max(last, keys[-1])
+        horizon = last[0] - LEGACY_LATE_MS
+    cursor["last_file"] = last[1]
+    cursor["recent"] = sorted(n for n in recent if _name_key(n)[0] >= horizon)
+    jsonl = path.with_suffix(".jsonl")
+    offset = cursor.get("offset", 0)
+    try:
+        if jsonl.stat().st_size < offset:
+            offset = 0  # Datei neu angelegt/gekuerzt
+    except FileNotFoundError:
+        offset = 0
+    new, cursor["offset"] = _read_jsonl_from(jsonl, offset)
+    items += new
+    items.sort(key=lambda d: int(d.get("ts", 0)))
+    return items
+
+
 # --- Metrics ---
 
 
-def compute_trade_metrics(trades: List[Dict[str, Any]]) -> Tuple[float, float, float, float]:
-    """Return (realized_pnl, profit_factor, winrate, max_drawdown_pct)"""
-    # Build equity from close events only
-    closes = [t for t in trades if t.get("event") == "close"]
-    if not closes:
-        return 0.0, 0.0, 0.0, 0.0
+def _new_agg_state() -> Dict[str, Any]:
+    return {
+        "paper_capital": PAPER_CAPITAL,
+        "cursors": {"trades": {}, "equity": {}},
+        "trades_n": 0,
+        "closes_n": 0,
+        "realized_pnl": 0.0,
+        "wins_sum": 0.0,
+        "losses_sum": 0.0,
+        "wins_n": 0,
+        "losses_n": 0,
+        "equity": PAPER_CAPITAL,
+        "peak_equity": PAPER_CAPITAL,
+        "max_dd": 0.0,
+        "equity_points": 0,
+    }
 
-    pnl_list = [float(t.get("profit", 0.0)) - float(t.get("fees", 0.0)) for t in closes]
-    wins = [p for p in pnl_list if p > 0]
-    losses = [abs(p) for p in pnl_list if p < 0]
 
-    realized_pnl = sum(pnl_list)
-    profit_factor = (sum(wins) / sum(losses)) if losses else (sum(wins) / 1e-9)
-    winrate = (len(wins) / len(pnl_list)) * 100.0
+def update_trade_metrics(agg: Dict[str, Any], trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rollende Aggregate um einen Batch neuer Trade-Events fortschreiben (nur close zaehlt)."""
+    agg["trades_n"] += len(trades)
+    pnls = np.array(
+        [
+            float(t.get("profit", 0.0)) - float(t.get("fees", 0.0))
+            for t in trades
+            if t.get("event") == "close"
+        ],
+        dtype=np.float64,
+    )
+    if not pnls.size:
+        return agg
+    # Masken einmal bilden; Summen per where= ohne Kopien der Teil-Arrays
+    win = pnls > 0
+    loss = pnls < 0
+    agg["closes_n"] += int(pnls.size)
+    agg["realized_pnl"] += float(pnls.sum())
+    agg["wins_sum"] += float(pnls.sum(where=win))
+    agg["wins_n"] += int(np.count_nonzero(win))
+    agg["losses_sum"] += float(-pnls.sum(where=loss))
+    agg["losses_n"] += int(np.count_nonzero(loss))
+
+    # equity curve: fortgesetzt ab letztem Stand, Peak inkl. bisherigem Hoechststand
+    equity = agg["equity"] + np.cumsum(pnls)
+    peak = np.maximum.accumulate(np.maximum(equity, agg["peak_equity"]))
+    dd = np.divide(peak - equity, peak, out=np.zeros_like(equity), where=peak > 0)
+    agg["equity"] = float(equity[-1])
+    agg["peak_equity"] = float(peak[-1])
+    agg["max_dd"] = max(agg["max_dd"], float(dd.max()))
+    return agg
+
+
+def trade_metrics(agg: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    """Return (realized_pnl, profit_factor, winrate, max_drawdown_pct)"""
+    if not agg["closes_n"]:
+        return 0.0, 0.0, 0.0, 0.0
+    losses = agg["losses_sum"] if agg["losses_n"] else 1e-9
+    profit_factor = agg["wins_sum"] / losses
+    winrate = (agg["wins_n"] / agg["closes_n"]) * 100.0
+    return agg["realized_pnl"], profit_factor, winrate, agg["max_dd"] * 100.0
 
-    # equity curve
-    equity = PAPER_CAPITAL
-    peak = PAPER_CAPITAL
-    max_dd = 0.0
-    for p in pnl_list:
-        equity += p
-        peak = max(peak, equity)
-        dd = (peak - equity) / peak if peak > 0 else 0.0
-        max_dd = max(max_dd, dd)
-    max_drawdown_pct = max_dd * 100.0
 
-    return realized_pnl, profit_factor, winrate, max_drawdown_pct
+def compute_trade_metrics(trades: List[Dict[str, Any]]) -> Tuple[float, float, float, float]:
+    """Return (realized_pnl, profit_factor, winrate, max_drawdown_pct)"""
+    return trade_metrics(update_trade_metrics(_new_agg_state(), trades))
 
 
 def latest_snapshot() -> Dict[str, Any]:
-    snaps = list(sorted(SNAP_DIR.glob("positions_*.json")))
-    if not snaps:
+    # aktueller Stand direkt aus current.json; positions_*.json nur noch fuer Altbestaende
+    try:
+        return _load_cached(SNAP_DIR / "current.json")
+    except FileNotFoundError:
+        pass
+    latest = _latest_json_name(SNAP_DIR, "positions_")
+    if latest is None:
         return {"exposures": [], "avg_leverage": 0.0}
-    with open(snaps[-1], "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _load_cached(SNAP_DIR / latest)
 
 
-def collect_equity_points() -> List[Tuple[int, float]]:
+def _equity_points(events: List[Dict[str, Any]]) -> List[Tuple[int, float]]:
     points: List[Tuple[int, float]] = []
-    for fn in sorted((EVENTS_DIR / "equity").glob("*.json")):
+    for d in events:
         try:
-            with open(fn, "r", encoding="utf-8") as f:
-                d = json.load(f)
-                points.append((int(d.get("ts", 0)), float(d.get("equity", PAPER_CAPITAL))))
+            points.append((int(d.get("ts", 0)), float(d.get("equity", PAPER_CAPITAL))))
         except Exception:
             pass
     return points
 
 
-def write_equity_csv(points: List[Tuple[int, float]]):
-    csv_path = REPORTS_DIR / "equity_curve.csv"
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["ts_ms", "equity"])
-        for ts, eq in points:
-            w.writerow([ts, eq])
+def collect_equity_points() -> List[Tuple[int, float]]:
+    return _equity_points(_read_json_files(EVENTS_DIR / "equity"))
+
+
+def write_equity_csv(points: List[Tuple[int, float]], append: bool = False):
+    # komplett im Speicher aufbauen, dann ein einziges write()
+    buf = io.BytesIO()
+    if not append:
+        buf.write(b"ts_ms,equity\n")
+    buf.writelines(f"{ts},{eq}\n".encode() for ts, eq in points)
+    with open(REPORTS_DIR / "equity_curve.csv", "ab" if append else "wb") as f:
+        f.write(buf.getvalue())
+
+
+AGG_STATE = REPORTS_DIR / "_agg_state.json"
+
+
+def load_agg_state() -> Dict[str, Any]:
+    # ohne gueltigen Zustand (oder ohne CSV) wird einmal komplett neu aggregiert
+    try:
+        agg = _loads(AGG_STATE.read_bytes())
+        if (
+            agg.get("paper_capital") == PAPER_CAPITAL
+            and (REPORTS_DIR / "equity_curve.csv").exists()
+        ):
+            return agg
+    except Exception:
+        pass
+    return _new_agg_state()
+
+
+def save_agg_state(agg: Dict[str, Any]):
+    tmp = AGG_STATE.with_suffix(".tmp")
+    tmp.write_bytes(_dumps(agg))
+    os.replace(tmp, AGG_STATE)
 
 
 def publish_status():
-    trades = _read_json_files(EVENTS_DIR / "trades")
-    realized_pnl, profit_factor, winrate, max_dd = compute_trade_metrics(trades)
+    # nur neue Events seit dem letzten Lauf lesen (O(Delta) statt O(N))
+    agg = load_agg_state()
+    trades = _read_new_events(EVENTS_DIR / "trades", agg["cursors"]["trades"])
+    update_trade_metrics(agg, trades)
+    realized_pnl, profit_factor, winrate, max_dd = trade_metrics(agg)
 
-    pts = collect_equity_points()
-    if not pts:
-        pts = [(int(time.time() * 1000), PAPER_CAPITAL)]
-    write_equity_csv(pts)
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    pts = _equity_points(_read_new_events(EVENTS_DIR / "equity", agg["cursors"]["equity"]))
+    if pts:
+        # Platzhalterzeile (noch keine Punkte) wird beim ersten echten Punkt ersetzt
+        write_equity_csv(pts, append=agg["equity_points"] > 0)
+        agg["equity_points"] += len(pts)
+    elif not agg["equity_points"]:
+        write_equity_csv([(int(time.time() * 1000), PAPER_CAPITAL)])
 
     snap = latest_snapshot()
 
@@ -112,16 +326,18 @@ def publish_status():
         "exposures": snap.get("exposures", []),
         "avg_leverage": snap.get("avg_leverage", 0.0),
         "last_update_ts": int(time.time() * 1000),
-        "counts": {"trades_total": len(trades), "equity_points": len(pts)},
+        "counts": {"trades_total": agg["trades_n"], "equity_points": agg["equity_points"] or 1},
     }
 
-    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     status_path = REPORTS_DIR / "status.json"
-    with open(status_path, "w", encoding="utf-8") as f:
-        json.dump(status, f, ensure_ascii=False, indent=2)
+    status_path.write_bytes(_dumps(status, indent=BRIDGE_PRETTY))
+    save_agg_state(agg)
 
+    global _last_git_publish
     if os.getenv("COOP_PUBLISH_TO_GIT", "false").lower() == "true":
-        git_publish()
+        if time.monotonic() - _last_git_publish >= GIT_MIN_INTERVAL:
+            _last_git_publish = time.monotonic()
+            git_publish()
 
     print("[bridge] published:", status_path)
 
@@ -133,35 +349,80 @@ def git(*args: str):
     subprocess.check_call(["git", *args], cwd=str(Path.cwd()))
 
 
-def git_publish():
-    try:
-        # ensure repo
-        if not (Path.cwd() / ".git").exists():
-            git("init")
+_REPO = None  # einmal geoeffnet und wiederverwendet (Index, Packfile-Cache)
+
+
+def _repo():
+    global _REPO
+    if _REPO is None:
+        root = Path.cwd()
+        if (root / ".git").exists():
+            _REPO = pygit2.Repository(str(root))
+        else:
+            _REPO = pygit2.init_repository(str(root))
             remote = os.getenv("GIT_REMOTE")
             if remote:
                 try:
-                    git("remote", "add", "origin", remote)
+                    _REPO.remotes.create("origin", remote)
                 except Exception:
                     pass
-        # stage & commit
-        git("add", str(REPORTS_DIR))
+    return _REPO
+
+
+def _commit_pygit2(msg: str, author_name: str, author_email: str):
+    repo = _repo()
+    index = repo.index
+    index.read()  # evtl. von aussen (git-CLI) geaendert
+    rel = Path(os.path.relpath(REPORTS_DIR.resolve(), repo.workdir)).as_posix()
+    index.add_all([rel])
+    # geloeschte Dateien wie bei "git add <dir>" austragen
+    for entry in list(index):
+        if entry.path.startswith(rel + "/") and not os.path.exists(
+            os.path.join(repo.workdir, entry.path)
+        ):
+            index.remove(entry.path)
+    index.write()
+    sig = pygit2.Signature(author_name, author_email)
+    parents = [] if repo.head_is_unborn else [repo.head.target]
+    repo.create_commit("HEAD", sig, sig, msg, index.write_tree(), parents)
+
+
+def _commit_cli(msg: str, author_name: str, author_email: str):
+    # ensure repo
+    if not (Path.cwd() / ".git").exists():
+        git("init")
+        remote = os.getenv("GIT_REMOTE")
+        if remote:
+            try:
+                git("remote", "add", "origin", remote)
+            except Exception:
+                pass
+    # stage & commit
+    git("add", str(REPORTS_DIR))
+    env = os.environ.copy()
+    env.update(
+        {
+            "GIT_AUTHOR_NAME": author_name,
+            "GIT_AUTHOR_EMAIL": author_email,
+            "GIT_COMMITTER_NAME": author_name,
+            "GIT_COMMITTER_EMAIL": author_email,
+        }
+    )
+    subprocess.check_call(
+        ["git", "commit", "-m", msg, "--allow-empty"], cwd=str(Path.cwd()), env=env
+    )
+
+
+def git_publish():
+    try:
         author_name = os.getenv("GH_AUTHOR_NAME", "bridge-bot")
         author_email = os.getenv("GH_AUTHOR_EMAIL", "bridge@example.com")
         msg = f"bridge: publish {int(time.time())}"
-        env = os.environ.copy()
-        env.update(
-            {
-                "GIT_AUTHOR_NAME": author_name,
-                "GIT_AUTHOR_EMAIL": author_email,
-                "GIT_COMMITTER_NAME": author_name,
-                "GIT_COMMITTER_EMAIL": author_email,
-            }
-        )
-        subprocess.check_call(
-            ["git", "commit", "-m", msg, "--allow-empty"], cwd=str(Path.cwd()), env=env
-        )
-        # push
+        if _PYGIT2_AVAILABLE:
+            _commit_pygit2(msg, author_name, author_email)
+        else:
+            _commit_cli(msg, author_name, author_email)
+        # push ueber die CLI: nutzt die vorhandenen Credential-Helper/SSH-Agent
         branch = os.getenv("GIT_BRANCH", "main")
         git("push", "-u", "origin", branch)
         print("[bridge] pushed reports to origin/", branch)
@@ -172,6 +433,13 @@ def git_publish():
 # --- CLI ---
 
 
+def run_publish():
+    try:
+        publish_status()
+    except Exception as e:
+        print("[bridge] error:", e)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument(
@@ -180,12 +448,22 @@ def main():
     args = ap.parse_args()
 
     print("[bridge] running; interval =", args.publish_interval, "s; out =", REPORTS_DIR)
-    while True:
-        try:
-            publish_status()
-        except Exception as e:
-            print("[bridge] error:", e)
-        time.sleep(args.publish_interval)
+    if _WATCHFILES_AVAILABLE:
+        # neue Events (500 ms gebuendelt) loesen sofort aus; ohne Aenderung spaetestens
+        # nach publish-interval als Heartbeat (leeres Change-Set bei Timeout)
+        run_publish()
+        for _changes in watchfiles.watch(
+            EVENTS_DIR,
+            SNAP_DIR,
+            debounce=500,
+            rust_timeout=args.publish_interval * 1000,
+            yield_on_timeout=True,
+        ):
+            run_publish()
+    else:
+        while True:
+            run_publish()
+            time.sleep(args.publish_interval)
 
 
 if __name__ == "__main__":
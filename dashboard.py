@@ -8,17 +8,20 @@
 # Start:  streamlit run dashboard.py
 # Deps:   pip install streamlit plotly pandas numpy
 
+import bisect
 import os
-import json
 import time
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Tuple
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
 import streamlit as st
 
+from bridge_io import dumps as _dumps, load_cached as _load_cached, read_json, read_jsonl_tail
+
 # -----------------------------
 # Settings / Pfade
 # -----------------------------
@@ -42,12 +45,32 @@ GATE_MAX_DD = 8.0
 # -----------------------------
 def load_json(path: Path) -> Dict[str, Any] | None:
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        return _load_cached(path)
     except Exception:
         return None
 
 
+def _json_names(path: Path, prefix: str = "") -> List[str]:
+    # nur Dateinamen (keine Path-Objekte, kein stat je Datei); fehlendes Verzeichnis = leer
+    try:
+        with os.scandir(path) as it:
+            return [e.name for e in it if e.name.startswith(prefix) and e.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+
+
+def _latest_json_name(path: Path, prefix: str) -> Optional[str]:
+    # neueste Datei per max() in einem Durchlauf statt komplett zu sortieren
+    try:
+        with os.scandir(path) as it:
+            return max(
+                (e.name for e in it if e.name.startswith(prefix) and e.name.endswith(".json")),
+                default=None,
+            )
+    except FileNotFoundError:
+        return None
+
+
 def ts2dt(ts_ms) -> str:
     try:
         return datetime.utcfromtimestamp(int(ts_ms) / 1000.0).strftime("%Y-%m-%d %H:%M:%S")
@@ -55,83 +78,149 @@ def ts2dt(ts_ms) -> str:
         return "-"
 
 
-def latest_status() -> Dict[str, Any]:
+def _mtime_ns(path: Path) -> int:
+    # Cache-Key fuer st.cache_data: aendert sich nur, wenn die Datei/das Verzeichnis sich aendert
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return -1
+
+
+@st.cache_data(ttl=REFRESH_SECS, show_spinner=False)
+def _latest_status(mtime_ns: int) -> Dict[str, Any]:
     return load_json(REPORTS / "status.json") or {}
 
 
-def equity_curve_df() -> pd.DataFrame:
+def latest_status() -> Dict[str, Any]:
+    return _latest_status(_mtime_ns(REPORTS / "status.json"))
+
+
+# feste Spaltentypen: keine Typ-Inferenz je Zelle beim Einlesen
+EQUITY_DTYPES = {"ts_ms": "int64", "equity": "float64"}
+
+
+def _empty_equity_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ts_ms": np.empty(0, dtype=np.int64),
+            "equity": np.empty(0, dtype=np.float64),
+            "dt": np.empty(0, dtype="datetime64[ms]"),
+        }
+    )
+
+
+@st.cache_data(ttl=REFRESH_SECS, show_spinner=False)
+def _equity_curve_df(mtime_ns: int) -> pd.DataFrame:
     csv = REPORTS / "equity_curve.csv"
-    if not csv.exists():
-        return pd.DataFrame(columns=["ts_ms", "equity"])
+    if mtime_ns < 0:
+        return _empty_equity_df()
     try:
-        df = pd.read_csv(csv)
+        df = pd.read_csv(csv, engine="c", dtype=EQUITY_DTYPES)
         if not {"ts_ms", "equity"}.issubset(df.columns):
-            return pd.DataFrame(columns=["ts_ms", "equity"])
+            return _empty_equity_df()
+        # Zeitachse einmal beim Laden: int64-ms direkt als datetime64[ms] (ohne Kopie)
+        df["dt"] = df["ts_ms"].to_numpy().view("datetime64[ms]")
         return df
     except Exception:
-        return pd.DataFrame(columns=["ts_ms", "equity"])
+        return _empty_equity_df()
 
 
-def latest_snapshot() -> Dict[str, Any]:
-    snaps = sorted(SNAPS.glob("positions_*.json"))
-    if not snaps:
+def equity_curve_df() -> pd.DataFrame:
+    return _equity_curve_df(_mtime_ns(REPORTS / "equity_curve.csv"))
+
+
+@st.cache_data(ttl=REFRESH_SECS, show_spinner=False)
+def _latest_snapshot(current_mtime_ns: int, dir_mtime_ns: int) -> Dict[str, Any]:
+    # aktueller Stand direkt aus current.json; positions_*.json nur noch fuer Altbestaende
+    if current_mtime_ns >= 0:
+        return load_json(SNAPS / "current.json") or {}
+    latest = _latest_json_name(SNAPS, "positions_")
+    if latest is None:
         return {}
-    return load_json(snaps[-1]) or {}
+    return load_json(SNAPS / latest) or {}
+
+
+def latest_snapshot() -> Dict[str, Any]:
+    return _latest_snapshot(_mtime_ns(SNAPS / "current.json"), _mtime_ns(SNAPS))
+
+
+def _cutoff_ms(days: int) -> int:
+    return int((time.time() - days * 86400) * 1000)
+
+
+def _name_ts(name: str) -> int:
+    # Altformat-Dateinamen beginnen mit dem ts: "<ts_ms>_<...>.json"
+    try:
+        return int(name.split("_", 1)[0])
+    except ValueError:
+        return 0
 
 
-def read_trade_events(limit: int = 5000) -> List[Dict[str, Any]]:
+@st.cache_data(ttl=REFRESH_SECS, show_spinner=False)
+def _read_trade_events(
+    dir_mtime_ns: int, jsonl_mtime_ns: int, limit: int, since_ms: int
+) -> List[Dict[str, Any]]:
     trade_dir = EVENTS / "trades"
-    if not trade_dir.exists():
-        return []
-    files = sorted(trade_dir.glob("*.json"))
     rows: List[Dict[str, Any]] = []
-    for fn in files[-limit:]:
-        try:
-            rows.append(json.loads(fn.read_text(encoding="utf-8")))
-        except Exception:
-            pass
-    return rows
+    if dir_mtime_ns >= 0:
+        # zu alte Dateien schon am Namen aussortieren, bevor irgendetwas geparst wird
+        names = [n for n in _json_names(trade_dir) if _name_ts(n) >= since_ms]
+        for name in sorted(names)[-limit:]:
+            try:
+                rows.append(read_json(os.path.join(trade_dir, name)))
+            except Exception:
+                pass
+    # neues Format: events/trades.jsonl (nach ts angehaengt) - nur das Fenster vom Ende her lesen
+    rows += read_jsonl_tail(EVENTS / "trades.jsonl", since_ms, limit)
+    rows.sort(key=lambda t: int(t.get("ts", 0)))
+    return rows[-limit:]
+
+
+def read_trade_events(limit: int = 5000, days: Optional[int] = None) -> List[Dict[str, Any]]:
+    # Altformat-Verzeichnis aendert mtime bei neuen Dateien, trades.jsonl beim Anhaengen;
+    # Cutoff auf volle Stunde abgerundet, damit der Cache-Key nicht bei jedem Rerun wechselt
+    since_ms = 0
+    if days is not None:
+        since_ms = _cutoff_ms(days) // 3_600_000 * 3_600_000
+    return _read_trade_events(
+        _mtime_ns(EVENTS / "trades"), _mtime_ns(EVENTS / "trades.jsonl"), limit, since_ms
+    )
 
 
 def compute_drawdown_from_pnls(pnls: List[float], start_equity: float) -> float:
     """Cumulative equity from start_equity + pnls; return Max DD % in window."""
-    equity = start_equity
-    peak = start_equity
-    max_dd = 0.0
-    for p in pnls:
-        equity += p
-        if equity > peak:
-            peak = equity
-        if peak > 0:
-            dd = (peak - equity) / peak * 100.0
-            if dd > max_dd:
-                max_dd = dd
-    return float(max_dd)
+    if not len(pnls):
+        return 0.0
+    equity = start_equity + np.cumsum(np.asarray(pnls, dtype=np.float64))
+    peak = np.maximum.accumulate(np.maximum(equity, start_equity))
+    dd = np.divide(peak - equity, peak, out=np.zeros_like(equity), where=peak > 0) * 100.0
+    return float(max(dd.max(), 0.0))
 
 
 def compute_profit_factor(pnls: List[float]) -> float:
-    wins = [p for p in pnls if p > 0]
-    losses = [abs(p) for p in pnls if p < 0]
-    if not wins and not losses:
+    # Masken-Summen ohne Kopien; pos/neg == 0 genau dann, wenn es keine Gewinne/Verluste gibt
+    arr = np.asarray(pnls, dtype=np.float64)
+    pos = float(arr.sum(where=arr > 0))
+    neg = float(-arr.sum(where=arr < 0))
+    if pos == 0 and neg == 0:
         return 0.0
-    if sum(losses) == 0:
-        return float(sum(wins) / 1e-9)
-    return float(sum(wins) / sum(losses))
+    if neg == 0:
+        return float(pos / 1e-9)
+    return float(pos / neg)
 
 
 def filter_close_pnls_last_days(
     trades: List[Dict[str, Any]], days: int
 ) -> Tuple[List[float], List[Dict[str, Any]]]:
-    cutoff = int((datetime.utcnow() - timedelta(days=days)).timestamp() * 1000)
+    cutoff = _cutoff_ms(days)
     pnls: List[float] = []
     closes: List[Dict[str, Any]] = []
-    for t in trades:
+    # trades ist nach ts sortiert (read_trade_events): Startindex per Binaersuche, O(log N)
+    start = bisect.bisect_left(trades, cutoff, key=lambda t: int(t.get("ts", 0)))
+    for t in trades[start:]:
         if t.get("event") == "close":
-            ts = int(t.get("ts", 0))
-            if ts >= cutoff:
-                p = float(t.get("profit", 0.0)) - float(t.get("fees", 0.0))
-                pnls.append(p)
-                closes.append(t)
+            pnls.append(float(t.get("profit", 0.0)) - float(t.get("fees", 0.0)))
+            closes.append(t)
     return pnls, closes
 
 
@@ -144,159 +233,160 @@ st.sidebar.caption(f"Aktualisiert automatisch alle {REFRESH_SECS} Sekunden")
 if st.sidebar.button("Jetzt aktualisieren", use_container_width=True):
     st.rerun()
 
-status = latest_status()
-paper_capital = float(status.get("paper_capital", 10000.0))
-realized_pnl = float(status.get("realized_pnl", 0.0))
-profit_factor = float(status.get("profit_factor", 0.0))
-winrate_pct = float(status.get("winrate_pct", 0.0))
-max_dd_pct = float(status.get("max_drawdown_pct", 0.0))
-last_update_ts = status.get("last_update_ts")
-
-c1, c2, c3, c4, c5 = st.columns(5)
-c1.metric("Startkapital (Paper)", f"{paper_capital:,.2f} €")
-c2.metric("Realized PnL (seit Start)", f"{realized_pnl:,.2f} €")
-c3.metric("Profit Factor (seit Start)", f"{profit_factor:.2f}")
-c4.metric("Winrate % (seit Start)", f"{winrate_pct:.2f}")
-c5.metric("Max Drawdown % (seit Start)", f"{max_dd_pct:.2f}")
-st.caption(f"Letztes Bridge-Update: {ts2dt(last_update_ts)} UTC")
-
-st.markdown("---")
-
-# -----------------------------
-# Equity-Kurve (seit Start)
-# -----------------------------
-st.subheader("📈 Equity-Kurve (seit Start)")
-eq = equity_curve_df()
-if not eq.empty:
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=pd.to_datetime(eq["ts_ms"], unit="ms"), y=eq["equity"], mode="lines", name="Equity"
-        )
-    )
-    fig.update_layout(margin=dict(l=10, r=10, t=20, b=10), height=300)
-    st.plotly_chart(fig, use_container_width=True)
-else:
-    st.info("Noch keine Equity-Punkte vorhanden.")
 
 # -----------------------------
-# 14-Tage Kennzahlen (aus CLOSE-Events)
+# Live-Panels: nur dieses Fragment laeuft alle REFRESH_SECS neu (nicht das ganze Skript)
 # -----------------------------
-st.subheader("🧪 14-Tage Kennzahlen (Trade-Close-Events)")
-trades = read_trade_events(limit=5000)
-pnls_14d, recent_closes = filter_close_pnls_last_days(trades, days=14)
-
-if pnls_14d:
-    net_pnl_14d = float(sum(pnls_14d))
-    pf_14d = compute_profit_factor(pnls_14d)
-    max_dd_14d = compute_drawdown_from_pnls(pnls_14d, paper_capital)
-
-    k1, k2, k3 = st.columns(3)
-    k1.metric("Net PnL (14d)", f"{net_pnl_14d:,.2f} €")
-    k2.metric("Profit Factor (14d)", f"{pf_14d:.2f}")
-    k3.metric("Max Drawdown (14d)", f"{max_dd_14d:.2f}%")
-
-    gate_ok = (net_pnl_14d > 0.0) and (pf_14d > GATE_PF) and (max_dd_14d < GATE_MAX_DD)
-
-    st.markdown("### ✅ 14-Day Gate")
-    if gate_ok:
-        st.success(f"Gate erfüllt ✅  (PnL>0, PF>{GATE_PF}, DD<{GATE_MAX_DD}%)")
-        # Button: Anfrage schreiben
-        if st.button("Echtgeld-Anfrage vorbereiten (Coinbase/Kraken/Bitget/Trade Republic)"):
-            payload = {
-                "ts": int(time.time() * 1000),
-                "when": datetime.utcnow().isoformat() + "Z",
-                "gate": {
-                    "net_pnl_14d": net_pnl_14d,
-                    "profit_factor_14d": pf_14d,
-                    "max_dd_14d": max_dd_14d,
-                },
-                "request": "APPROVAL_FOR_REAL_MONEY_CONNECTION",
-                "notes": "Bitte bestätigen, welche Börse(n) in DE verbunden werden sollen.",
-            }
-            out = REPORTS / f"gate_request_{payload['ts']}.json"
-            out.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            st.success(f"Anfrage geschrieben: {out}")
+@st.fragment(run_every=REFRESH_SECS)
+def _live_panels():
+    status = latest_status()
+    paper_capital = float(status.get("paper_capital", 10000.0))
+    realized_pnl = float(status.get("realized_pnl", 0.0))
+    profit_factor = float(status.get("profit_factor", 0.0))
+    winrate_pct = float(status.get("winrate_pct", 0.0))
+    max_dd_pct = float(status.get("max_drawdown_pct", 0.0))
+    last_update_ts = status.get("last_update_ts")
+
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Startkapital (Paper)", f"{paper_capital:,.2f} €")
+    c2.metric("Realized PnL (seit Start)", f"{realized_pnl:,.2f} €")
+    c3.metric("Profit Factor (seit Start)", f"{profit_factor:.2f}")
+    c4.metric("Winrate % (seit Start)", f"{winrate_pct:.2f}")
+    c5.metric("Max Drawdown % (seit Start)", f"{max_dd_pct:.2f}")
+    st.caption(f"Letztes Bridge-Update: {ts2dt(last_update_ts)} UTC")
+
+    st.markdown("---")
+
+    # -----------------------------
+    # Equity-Kurve (seit Start)
+    # -----------------------------
+    st.subheader("📈 Equity-Kurve (seit Start)")
+    eq = equity_curve_df()
+    if not eq.empty:
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=eq["dt"], y=eq["equity"], mode="lines", name="Equity"))
+        fig.update_layout(margin=dict(l=10, r=10, t=20, b=10), height=300)
+        st.plotly_chart(fig, use_container_width=True)
     else:
-        reasons = []
-        if not (net_pnl_14d > 0.0):
-            reasons.append("Net PnL ≤ 0")
-        if not (pf_14d > GATE_PF):
-            reasons.append(f"Profit Factor ≤ {GATE_PF}")
-        if not (max_dd_14d < GATE_MAX_DD):
-            reasons.append(f"Max DD ≥ {GATE_MAX_DD}%")
-        st.error("Gate **nicht** erfüllt ❌ – " + ", ".join(reasons))
-        st.caption("Der Bot läuft weiter im Paper-Mode. Optimierung/Feintuning empfohlen.")
-
-else:
-    st.info("Für die letzten 14 Tage liegen noch keine CLOSE-Events vor (oder zu wenige).")
+        st.info("Noch keine Equity-Punkte vorhanden.")
+
+    # -----------------------------
+    # 14-Tage Kennzahlen (aus CLOSE-Events)
+    # -----------------------------
+    st.subheader("🧪 14-Tage Kennzahlen (Trade-Close-Events)")
+    trades = read_trade_events(limit=5000, days=14)
+    pnls_14d, recent_closes = filter_close_pnls_last_days(trades, days=14)
+
+    if pnls_14d:
+        # einmal nach NumPy, dann fuer alle drei Kennzahlen wiederverwenden
+        pnl_arr = np.asarray(pnls_14d, dtype=np.float64)
+        net_pnl_14d = float(pnl_arr.sum())
+        pf_14d = compute_profit_factor(pnl_arr)
+        max_dd_14d = compute_drawdown_from_pnls(pnl_arr, paper_capital)
+
+        k1, k2, k3 = st.columns(3)
+        k1.metric("Net PnL (14d)", f"{net_pnl_14d:,.2f} €")
+        k2.metric("Profit Factor (14d)", f"{pf_14d:.2f}")
+        k3.metric("Max Drawdown (14d)", f"{max_dd_14d:.2f}%")
+
+        gate_ok = (net_pnl_14d > 0.0) and (pf_14d > GATE_PF) and (max_dd_14d < GATE_MAX_DD)
+
+        st.markdown("### ✅ 14-Day Gate")
+        if gate_ok:
+            st.success(f"Gate erfüllt ✅  (PnL>0, PF>{GATE_PF}, DD<{GATE_MAX_DD}%)")
+            # Button: Anfrage schreiben
+            if st.button("Echtgeld-Anfrage vorbereiten (Coinbase/Kraken/Bitget/Trade Republic)"):
+                payload = {
+                    "ts": int(time.time() * 1000),
+                    "when": datetime.utcnow().isoformat() + "Z",
+                    "gate": {
+                        "net_pnl_14d": net_pnl_14d,
+                        "profit_factor_14d": pf_14d,
+                        "max_dd_14d": max_dd_14d,
+                    },
+                    "request": "APPROVAL_FOR_REAL_MONEY_CONNECTION",
+                    "notes": "Bitte bestätigen, welche Börse(n) in DE verbunden werden sollen.",
+                }
+                out = REPORTS / f"gate_request_{payload['ts']}.json"
+                out.write_bytes(_dumps(payload))
+                st.success(f"Anfrage geschrieben: {out}")
+        else:
+            reasons = []
+            if not (net_pnl_14d > 0.0):
+                reasons.append("Net PnL ≤ 0")
+            if not (pf_14d > GATE_PF):
+                reasons.append(f"Profit Factor ≤ {GATE_PF}")
+            if not (max_dd_14d < GATE_MAX_DD):
+                reasons.append(f"Max DD ≥ {GATE_MAX_DD}%")
+            st.error("Gate **nicht** erfüllt ❌ – " + ", ".join(reasons))
+            st.caption("Der Bot läuft weiter im Paper-Mode. Optimierung/Feintuning empfohlen.")
 
-# -----------------------------
-# Offene Positionen (Snapshot)
-# -----------------------------
-st.markdown("---")
-st.subheader("📦 Offene Positionen (letzter Snapshot)")
-snap = latest_snapshot()
-pos_df = pd.DataFrame(snap.get("exposures", []))
-if not pos_df.empty:
-    pos_df = pos_df.sort_values("notional_eur", ascending=False)
-    st.dataframe(pos_df, use_container_width=True)
-    if {"symbol", "notional_eur"}.issubset(pos_df.columns):
-        exp_fig = go.Figure()
-        exp_fig.add_trace(
-            go.Bar(
-                x=pos_df["symbol"].astype(str),
-                y=pos_df["notional_eur"].astype(float),
-                name="Exposure €",
+    else:
+        st.info("Für die letzten 14 Tage liegen noch keine CLOSE-Events vor (oder zu wenige).")
+
+    # -----------------------------
+    # Offene Positionen (Snapshot)
+    # -----------------------------
+    st.markdown("---")
+    st.subheader("📦 Offene Positionen (letzter Snapshot)")
+    snap = latest_snapshot()
+    pos_df = pd.DataFrame(snap.get("exposures", []))
+    if not pos_df.empty:
+        pos_df = pos_df.sort_values("notional_eur", ascending=False)
+        st.dataframe(pos_df, use_container_width=True)
+        if {"symbol", "notional_eur"}.issubset(pos_df.columns):
+            exp_fig = go.Figure()
+            exp_fig.add_trace(
+                go.Bar(
+                    x=pos_df["symbol"].astype(str),
+                    y=pos_df["notional_eur"].astype(float),
+                    name="Exposure €",
+                )
             )
-        )
-        exp_fig.update_layout(margin=dict(l=10, r=10, t=20, b=10), height=260)
-        st.plotly_chart(exp_fig, use_container_width=True)
-else:
-    st.info("Keine offenen Positionen erkannt.")
+            exp_fig.update_layout(margin=dict(l=10, r=10, t=20, b=10), height=260)
+            st.plotly_chart(exp_fig, use_container_width=True)
+    else:
+        st.info("Keine offenen Positionen erkannt.")
+
+    # -----------------------------
+    # Letzte Trades (Open/Close + Rationale)
+    # -----------------------------
+    st.subheader("🧾 Letzte Trades")
+    if trades:
+        view_rows: List[Dict[str, Any]] = []
+        for t in trades[-120:]:
+            evt = t.get("event")
+            symbol = t.get("symbol")
+            ts = t.get("ts")
+            if evt == "open":
+                view_rows.append(
+                    {
+                        "Zeit (UTC)": ts2dt(ts),
+                        "Event": "OPEN",
+                        "Symbol": symbol,
+                        "Preis/Exit": t.get("price"),
+                        "Qty": t.get("qty"),
+                        "Exchange": t.get("exchange"),
+                        "Strategie": t.get("strategy_id"),
+                        "Rationale": t.get("rationale", ""),
+                    }
+                )
+            elif evt == "close":
+                view_rows.append(
+                    {
+                        "Zeit (UTC)": ts2dt(ts),
+                        "Event": "CLOSE",
+                        "Symbol": symbol,
+                        "Preis/Exit": t.get("exit_price"),
+                        "PnL €": t.get("profit"),
+                        "PnL %": t.get("pnl_pct"),
+                        "Fees": t.get("fees", 0.0),
+                    }
+                )
+        tdf = pd.DataFrame(view_rows)
+        st.dataframe(tdf, use_container_width=True)
+    else:
+        st.info("Noch keine Trade-Events vorhanden.")
 
-# -----------------------------
-# Letzte Trades (Open/Close + Rationale)
-# -----------------------------
-st.subheader("🧾 Letzte Trades")
-if trades:
-    view_rows: List[Dict[str, Any]] = []
-    for t in trades[-120:]:
-        evt = t.get("event")
-        symbol = t.get("symbol")
-        ts = t.get("ts")
-        if evt == "open":
-            view_rows.append(
-                {
-                    "Zeit (UTC)": ts2dt(ts),
-                    "Event": "OPEN",
-                    "Symbol": symbol,
-                    "Preis/Exit": t.get("price"),
-                    "Qty": t.get("qty"),
-                    "Exchange": t.get("exchange"),
-                    "Strategie": t.get("strategy_id"),
-                    "Rationale": t.get("rationale", ""),
-                }
-            )
-        elif evt == "close":
-            view_rows.append(
-                {
-                    "Zeit (UTC)": ts2dt(ts),
-                    "Event": "CLOSE",
-                    "Symbol": symbol,
-                    "Preis/Exit": t.get("exit_price"),
-                    "PnL €": t.get("profit"),
-                    "PnL %": t.get("pnl_pct"),
-                    "Fees": t.get("fees", 0.0),
-                }
-            )
-    tdf = pd.DataFrame(view_rows)
-    st.dataframe(tdf, use_container_width=True)
-else:
-    st.info("Noch keine Trade-Events vorhanden.")
 
-# -----------------------------
-# Auto-Refresh
-# -----------------------------
-time.sleep(REFRESH_SECS)
-st.rerun()
+_live_panels()
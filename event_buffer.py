@@ -0,0 +1,54 @@
+# event_buffer.py — gepuffertes Anhaengen an bridge_out/events/<kind>.jsonl
+# Nur stdlib: wird von bot_instrumentation und vom Fallback-Logger in bot.py geteilt.
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class EventBuffer:
+    """Sammelt Events je Typ im Speicher und haengt sie gebuendelt an <root>/<kind>.jsonl an.
+
+    Geflusht wird ab 64 KiB gepuffertem Inhalt oder 500 ms nach dem ersten ungeflushten Event
+    (per Timer, auch wenn keine weiteren Events kommen). Beim Prozessende muss der Aufrufer
+    flush_all() registrieren (atexit).
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 64 * 1024, max_age_sec: float = 0.5):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+        self.lock = threading.Lock()
+        self.buffers: Dict[str, List[bytes]] = {}
+        self.size = 0
+        self.timer: Optional[threading.Timer] = None
+
+    def path(self, kind: str) -> Path:
+        return self.root / f"{kind}.jsonl"
+
+    def append(self, kind: str, line: bytes) -> Path:
+        with self.lock:
+            self.buffers.setdefault(kind, []).append(line)
+            self.size += len(line)
+            if self.size >= self.max_bytes:
+                self._flush_locked()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.max_age_sec, self.flush_all)
+                self.timer.daemon = True
+                self.timer.start()
+        return self.path(kind)
+
+    def flush_all(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for kind, lines in self.buffers.items():
+            if lines:
+                # ein open + ein write() je Typ statt einer Datei je Event
+                with open(self.path(kind), "ab") as f:
+                    f.write(b"".join(lines))
+                lines.clear()
+        self.size = 0
@@ -1,11 +1,14 @@
 # risk_guard.py — Drawdown Sentinel: melden, reagieren, verbessern
 # Laeuft parallel zur Bridge & bot.py. Keine Boersen-Keys noetig.
 
-import json
+import os
 import time
 from pathlib import Path
 from datetime import datetime
 
+from bridge_io import WATCHFILES_AVAILABLE as _WATCHFILES_AVAILABLE, watchfiles
+from bridge_io import dumps as _dumps, load_cached as _load_cached
+
 ROOT = Path.cwd()
 BRIDGE_OUT = ROOT / "bridge_out"
 REPORTS = BRIDGE_OUT / "reports"
@@ -14,8 +17,18 @@ CONTROL = BRIDGE_OUT / "control"
 CONTROL.mkdir(parents=True, exist_ok=True)
 
 STATUS_PATH = REPORTS / "status.json"
+CONFIG_PATH = ROOT / "config" / "config.yaml"
+
+
+# --------- Defaults + optionales Nachladen aus config ----------
+# config_loader (yaml/pydantic) optional; load_config ist per (Pfad, mtime) gecacht
+try:
+    from config_loader import load_config
+
+    _CONFIG_AVAILABLE = True
+except Exception:
+    _CONFIG_AVAILABLE = False
 
-# --------- Defaults + optionales Nachladen aus config (ohne E402) ----------
 MAX_DD_LIMIT = 8.0  # %
 DAY_LOSS_LIMIT = -3.0  # %
 
@@ -23,10 +36,10 @@ DAY_LOSS_LIMIT = -3.0  # %
 def _refresh_limits():
     """Optional: aus config/config.yaml nachladen; faellt sonst auf Defaults zurueck."""
     global MAX_DD_LIMIT, DAY_LOSS_LIMIT
+    if not _CONFIG_AVAILABLE:
+        return
     try:
-        from config_loader import load_config  # lokal importiert -> keine E402
-
-        cfg = load_config()
+        cfg = load_config(CONFIG_PATH)
         MAX_DD_LIMIT = float(cfg.risk.max_drawdown_pct)
         DAY_LOSS_LIMIT = float(cfg.risk.day_loss_limit_pct)
     except Exception:
@@ -38,17 +51,32 @@ def _refresh_limits():
 
 def load_json(path: Path):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return _load_cached(path)
     except Exception:
         return None
 
 
 def latest_snapshot():
-    snaps = sorted(SNAPSHOTS.glob("positions_*.json"))
-    if not snaps:
+    # aktueller Stand direkt aus current.json; positions_*.json nur noch fuer Altbestaende
+    current = SNAPSHOTS / "current.json"
+    if current.exists():
+        return load_json(current)
+    # neueste Datei per max() ueber die Namen, ohne Liste zu sortieren
+    try:
+        with os.scandir(SNAPSHOTS) as it:
+            latest = max(
+                (
+                    e.name
+                    for e in it
+                    if e.name.startswith("positions_") and e.name.endswith(".json")
+                ),
+                default=None,
+            )
+    except FileNotFoundError:
         return None
-    return load_json(snaps[-1])
+    if latest is None:
+        return None
+    return load_json(SNAPSHOTS / latest)
 
 
 def worst_offenders(snapshot, topn=2):
@@ -63,23 +91,24 @@ def worst_offenders(snapshot, topn=2):
     return syms
 
 
+def _write_json(path: Path, obj):
+    # kompakt (ohne indent): nur Maschinen lesen diese Dateien
+    path.write_bytes(_dumps(obj))
+
+
 def write_control(pause: bool, to_close_symbols, tuning):
+    # ein write() je Datei statt vieler kleiner Writes von json.dump
     mode = {"pause_new_signals": bool(pause), "ts": int(time.time() * 1000)}
-    with open(CONTROL / "mode.json", "w", encoding="utf-8") as f:
-        json.dump(mode, f, ensure_ascii=False, indent=2)
+    _write_json(CONTROL / "mode.json", mode)
 
     if to_close_symbols:
-        with open(CONTROL / "force_close.json", "w", encoding="utf-8") as f:
-            json.dump(
-                {"symbols": to_close_symbols, "ts": int(time.time() * 1000)},
-                f,
-                ensure_ascii=False,
-                indent=2,
-            )
+        _write_json(
+            CONTROL / "force_close.json",
+            {"symbols": to_close_symbols, "ts": int(time.time() * 1000)},
+        )
 
     if tuning:
-        with open(CONTROL / "tuning.json", "w", encoding="utf-8") as f:
-            json.dump(tuning, f, ensure_ascii=False, indent=2)
+        _write_json(CONTROL / "tuning.json", tuning)
 
 
 def write_alert_report(kind, status, offenders, tuning):
@@ -92,8 +121,7 @@ def write_alert_report(kind, status, offenders, tuning):
         "tuning": tuning,
     }
     fn = REPORTS / f"guard_alert_{alert['ts']}.json"
-    with open(fn, "w", encoding="utf-8") as f:
-        json.dump(alert, f, ensure_ascii=False, indent=2)
+    _write_json(fn, alert)
     print("[guard] ALERT:", kind, "->", fn)
 
 
@@ -106,46 +134,81 @@ def propose_tuning(status):
     }
 
 
+def check_status(last_seen_ts):
+    """Prueft status.json einmal; liefert den zuletzt verarbeiteten last_update_ts."""
+    st = load_json(STATUS_PATH)
+    if st and st.get("last_update_ts") != last_seen_ts:
+        last_seen_ts = st.get("last_update_ts")
+        _ = float(st.get("winrate_pct", 0.0))  # Platzhalter – day PnL waere besser via risk events
+        max_dd = float(st.get("max_drawdown_pct", 0.0))
+
+        snap = latest_snapshot()  # fuer exposures
+        status = {
+            "paper_capital": st.get("paper_capital"),
+            "realized_pnl": st.get("realized_pnl"),
+            "profit_factor": st.get("profit_factor"),
+            "winrate_pct": st.get("winrate_pct"),
+            "max_drawdown_pct": max_dd,
+        }
+
+        trigger = None
+        if max_dd >= MAX_DD_LIMIT:
+            trigger = "MAX_DRAWDOWN_EXCEEDED"
+        # Beispiel fuer DAY_LOSS_LIMIT koennte hier spaeter ergaenzt werden
+
+        if trigger:
+            offenders = worst_offenders(snap, topn=2)
+            tuning = propose_tuning(status)
+            write_alert_report(trigger, status, offenders, tuning)
+            write_control(True, offenders, tuning)
+        else:
+            # alles ok -> ggf. Pause sanft aufheben
+            write_control(False, [], None)
+
+    return last_seen_ts
+
+
+def _config_stamp():
+    # mtime der config.yaml (None, wenn sie fehlt) fuer den Sleep-Loop ohne watchfiles
+    try:
+        return CONFIG_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _is_watched_file(_change, path: str) -> bool:
+    return Path(path) in (STATUS_PATH, CONFIG_PATH)
+
+
 def main():
-    # nur EINMAL Limits aus config ziehen (falls vorhanden), sonst Defaults behalten
+    # Limits aus config ziehen (falls vorhanden), sonst Defaults behalten
     _refresh_limits()
     print("[guard] running... watching", STATUS_PATH)
-    last_seen_ts = None
-
-    while True:
-        st = load_json(STATUS_PATH)
-        if st and st.get("last_update_ts") != last_seen_ts:
-            last_seen_ts = st.get("last_update_ts")
-
-            _ = float(
-                st.get("winrate_pct", 0.0)
-            )  # Platzhalter – day PnL waere besser via risk events
-            max_dd = float(st.get("max_drawdown_pct", 0.0))
-
-            snap = latest_snapshot()  # fuer exposures
-            status = {
-                "paper_capital": st.get("paper_capital"),
-                "realized_pnl": st.get("realized_pnl"),
-                "profit_factor": st.get("profit_factor"),
-                "winrate_pct": st.get("winrate_pct"),
-                "max_drawdown_pct": max_dd,
-            }
-
-            trigger = None
-            if max_dd >= MAX_DD_LIMIT:
-                trigger = "MAX_DRAWDOWN_EXCEEDED"
-            # Beispiel fuer DAY_LOSS_LIMIT koennte hier spaeter ergaenzt werden
-
-            if trigger:
-                offenders = worst_offenders(snap, topn=2)
-                tuning = propose_tuning(status)
-                write_alert_report(trigger, status, offenders, tuning)
-                write_control(True, offenders, tuning)
-            else:
-                # alles ok -> ggf. Pause sanft aufheben
-                write_control(False, [], None)
-
-        time.sleep(15)  # alle 15s pruefen
+    last_seen_ts = check_status(None)
+
+    if _WATCHFILES_AVAILABLE:
+        # aufwachen nur, wenn status.json oder config.yaml geschrieben wurde
+        REPORTS.mkdir(parents=True, exist_ok=True)
+        dirs = [REPORTS] + ([CONFIG_PATH.parent] if CONFIG_PATH.parent.is_dir() else [])
+        for changes in watchfiles.watch(
+            *dirs, watch_filter=_is_watched_file, debounce=200, recursive=False
+        ):
+            if any(Path(p) == CONFIG_PATH for _c, p in changes):
+                # Hot-Reload der Limits
+                _refresh_limits()
+                print("[guard] limits reloaded:", MAX_DD_LIMIT, DAY_LOSS_LIMIT)
+            last_seen_ts = check_status(last_seen_ts)
+    else:
+        config_stamp = _config_stamp()
+        while True:
+            time.sleep(15)  # alle 15s pruefen
+            stamp = _config_stamp()
+            if stamp != config_stamp:
+                # Hot-Reload der Limits auch ohne watchfiles
+                config_stamp = stamp
+                _refresh_limits()
+                print("[guard] limits reloaded:", MAX_DD_LIMIT, DAY_LOSS_LIMIT)
+            last_seen_ts = check_status(last_seen_ts)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# Kernel fuer scripts/backtest.py. Als Skript ausgefuehrt wird er per numba.pycc
+# vorab kompiliert (backtest_kernels.*.so), dann entfaellt zur Laufzeit der numba-Import
+# samt JIT-Warmup:  python scripts/_backtest_kernels.py
+import numpy as np
+
+
+def equity_stats_loop(a, running_max, prev):
+    # ein Durchlauf: laufendes Maximum, max. Drawdown und Welford-Momente (n, mean, M2)
+    # der Returns; running_max/prev kommen aus dem vorigen Chunk (-inf/NaN vor dem ersten).
+    # NaN-Luecken wie pandas: cummax()/min() ueberspringen sie, pct_change() rechnet mit dem
+    # letzten gueltigen Wert weiter (fill_method="pad"), NaN-Returns fallen weg (dropna()).
+    # np.divide statt "/": Division durch 0 ergibt inf/nan wie in NumPy, auch im
+    # AOT-Build (pycc kennt kein error_model="numpy")
+    max_dd = 0.0
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(a.shape[0]):
+        x = a[i]
+        if x > running_max:
+            running_max = x
+        dd = np.divide(x, running_max) - 1.0
+        if dd < max_dd:
+            max_dd = dd
+        if np.isnan(x):
+            x = prev
+        r = np.divide(x, prev) - 1.0
+        if not np.isnan(r):
+            n += 1
+            d = r - mean
+            mean += d / n
+            m2 += d * (r - mean)
+        prev = x
+    return running_max, max_dd, n, mean, m2, prev
+
+
+if __name__ == "__main__":
+    from numba.pycc import CC
+
+    cc = CC("backtest_kernels")
+    cc.export("equity_stats", "Tuple((f8, f8, i8, f8, f8, f8))(f8[::1], f8, f8)")(equity_stats_loop)
+    cc.compile()
+    print(f"Kernel kompiliert nach: {cc.output_dir}")
@@ -1,8 +1,338 @@
 #!/usr/bin/env python
 import argparse
+import hashlib
+import math
+import os
 import sys
+import zipfile
+from itertools import islice
 from pathlib import Path
 
+from _backtest_kernels import equity_stats_loop
+
+# vorab kompilierter Kernel (python scripts/_backtest_kernels.py): kein numba-Import/JIT
+try:
+    from backtest_kernels import equity_stats as _equity_stats_aot
+
+    _AOT_AVAILABLE = True
+except ImportError:
+    _AOT_AVAILABLE = False
+
+_NUMBA_AVAILABLE = False
+if not _AOT_AVAILABLE:
+    try:
+        from numba import njit
+
+        _NUMBA_AVAILABLE = True
+    except Exception:
+        pass
+
+DEFAULT_OUT = "bridge_out/reports/equity_curve.png"
+# Punkte je Chunk, die fuer den Plot behalten werden, sobald die Datei mehrere Chunks hat
+PLOT_CHUNK_POINTS = 10_000
+# Obergrenze der behaltenen Plotpunkte bei mehreren Chunks (float32, ~400 KB), egal wie klein
+# chunksize ist: wird sie erreicht, verdoppelt sich der Abstand der Punkte
+PLOT_KEEP_POINTS = 100_000
+# mehr Punkte als Pixel bringen im Plot nichts, kosten aber Pfadaufbau und Dateigroesse
+PLOT_MAX_POINTS = 4000
+# Kennzahlen + Plotpunkte je (Pfad, Spalte, Groesse, mtime) der CSV
+CACHE_DIR = Path.home() / ".cache" / "tradingbot" / "equity"
+# Teil des Cache-Keys: erhoehen, wenn sich Kennzahlen-Logik oder npz-Layout aendern
+CACHE_VERSION = 2
+_STATE_KEYS = ("start", "end", "prev", "running_max", "max_dd", "n", "mean", "m2")
+
+
+def _equity_stats_np(a, running_max, prev):
+    # Fallback ohne numba: gleiche Kennzahlen ueber NumPy-Vektoroperationen,
+    # alle Zwischenergebnisse nacheinander in einem einzigen N-Puffer (out=)
+    import numpy as np
+
+    if a.size == 0:
+        return running_max, 0.0, 0, 0.0, 0.0, prev
+    buf = np.empty_like(a)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # fmax/fmin ueberspringen NaN wie cummax()/min() in pandas
+        np.fmax.accumulate(a, out=buf)
+        np.fmax(buf, running_max, out=buf)
+        running_max = float(buf[-1])
+        np.divide(a, buf, out=buf)
+        buf -= 1.0
+        max_dd = min(0.0, float(np.fmin.reduce(buf)))
+
+        # NaN-Luecken mit dem letzten gueltigen Wert fuellen (pct_change, fill_method="pad");
+        # der Index-Puffer entsteht nur, wenn der Chunk Luecken hat
+        gaps = np.isnan(a)
+        if gaps.any():
+            idx = np.where(gaps, -1, np.arange(a.size))
+            np.maximum.accumulate(idx, out=idx)
+            a = np.where(idx >= 0, a[idx], prev)
+        # Returns x/prev - 1 im selben Puffer, dann zentrierte Quadratsumme (M2)
+        buf[0] = prev
+        buf[1:] = a[:-1]
+        np.divide(a, buf, out=buf)
+        buf -= 1.0
+        # NaN-Returns (erster Wert, 0/0) fallen weg wie bei dropna()
+        bad = np.isnan(buf)
+        n_bad = int(np.count_nonzero(bad))
+        if n_bad == 1 and bad[0]:
+            r = buf[1:]
+        elif n_bad:
+            r = buf[~bad]
+        else:
+            r = buf
+        if r.size == 0:
+            return running_max, max_dd, 0, 0.0, 0.0, float(a[-1])
+        mean = float(r.mean())
+        r -= mean
+        m2 = float(np.dot(r, r))
+    return running_max, max_dd, r.size, mean, m2, float(a[-1])
+
+
+if _AOT_AVAILABLE:
+    _equity_stats = _equity_stats_aot
+elif _NUMBA_AVAILABLE:
+    # fastmath ohne "nnan"/"ninf": NaN-Luecken und Start bei 0 verhalten sich wie in NumPy
+    _equity_stats = njit(
+        cache=True, error_model="numpy", fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}
+    )(equity_stats_loop)
+else:
+    _equity_stats = _equity_stats_np
+
+
+def _merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    # Chan et al.: (n, mean, M2) zweier Teilfolgen in O(1) kombinieren
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+
+def _new_state():
+    return {
+        "start": None,
+        "end": None,
+        "prev": float("nan"),
+        "running_max": float("-inf"),
+        "max_dd": 0.0,
+        "n": 0,
+        "mean": 0.0,
+        "m2": 0.0,
+    }
+
+
+def _update_state(state, a):
+    # Chunk in die laufenden Kennzahlen einrechnen (Return ueber die Chunk-Grenze inklusive)
+    if a.size == 0:
+        return
+    if state["start"] is None:
+        state["start"] = float(a[0])
+    running_max, max_dd, n, mean, m2, prev = _equity_stats(a, state["running_max"], state["prev"])
+    state["prev"] = float(prev)
+    state["end"] = float(a[-1])
+    state["running_max"] = float(running_max)
+    state["max_dd"] = min(state["max_dd"], float(max_dd))
+    state["n"], state["mean"], state["m2"] = _merge_moments(
+        state["n"], state["mean"], state["m2"], int(n), float(mean), float(m2)
+    )
+
+
+def _volatility(n, m2):
+    # Stichproben-Std (ddof=1 wie Series.std()) * sqrt(n) aus den Welford-Momenten
+    if n < 2:
+        return float("nan")
+    return math.sqrt(m2 / (n - 1) * n)
+
+
+def _header_names(csv_path):
+    # Spaltennamen aus der Kopfzeile; None wenn unlesbar
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+    try:
+        line = header.decode("utf-8-sig").rstrip("\r\n")
+    except UnicodeDecodeError:
+        return None
+    if not line:
+        return None
+    return [c.strip('"') for c in line.split(",")]
+
+
+def _iter_arrow(csv_path, name, chunksize):
+    # pyarrow: mehrthreadiger C++-Parser (SIMD-Scan/Float-Parsing), liest nur die eine
+    # Spalte blockweise aus einer per mmap eingeblendeten Datei (keine read()-Kopie)
+    import pyarrow as pa
+    import pyarrow.csv as pac
+
+    # Blockgroesse in Bytes, grob ~24 Byte je Zeile
+    block_size = min(max(chunksize * 24, 1 << 20), 1 << 30)
+    with pa.memory_map(str(csv_path), "r") as source:
+        reader = pac.open_csv(
+            source,
+            read_options=pac.ReadOptions(use_threads=True, block_size=block_size),
+            parse_options=pac.ParseOptions(delimiter=","),
+            convert_options=pac.ConvertOptions(
+                include_columns=[name], column_types={name: pa.float64()}
+            ),
+        )
+        for batch in reader:
+            yield batch.column(0).to_numpy(zero_copy_only=False)
+
+
+def _iter_loadtxt(csv_path, col, chunksize):
+    # Schneller Pfad: je chunksize Zeilen nur die eine Spalte direkt als float64 lesen
+    import numpy as np
+
+    with open(csv_path, "r", encoding="utf-8-sig") as f:
+        next(f, None)
+        while True:
+            lines = list(islice(f, chunksize))
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=",", usecols=(col,), dtype=np.float64, ndmin=1)
+
+
+def _iter_pandas(csv_path, column, chunksize):
+    # Fallback fuer Sonderfaelle (Quotes, fehlende Werte, ...): pandas in Chunks,
+    # C-Parser tokenisiert nur die eine Spalte
+    import numpy as np
+
+    try:
+        import pandas as pd
+    except Exception as e:
+        print("pandas nicht installiert:", e)
+        sys.exit(1)
+
+    reader = pd.read_csv(
+        csv_path,
+        usecols=[column],
+        dtype={column: np.float64},
+        engine="c",
+        memory_map=True,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        yield np.ascontiguousarray(chunk[column].to_numpy())
+
+
+def _plot_keep(buf, n, a, offset, stride):
+    # Punkte von a (ab Zeile offset) auf dem Raster x = i * stride an buf[:n] anhaengen;
+    # passt der Chunk nicht mehr, jeden zweiten Punkt verwerfen und das Raster verdoppeln
+    while True:
+        part = a[-offset % stride :: stride]
+        if n + part.size <= buf.size:
+            buf[n : n + part.size] = part
+            return n + part.size, stride
+        half = (n + 1) // 2
+        buf[:half] = buf[:n:2]
+        n, stride = half, stride * 2
+
+
+def _consume(chunks, chunksize, keep_plot):
+    # Chunks in den Zustand einrechnen; fuer den Plot bleibt bei mehreren Chunks
+    # nur jeder stride-te Punkt in einem festen float32-Puffer (PLOT_KEEP_POINTS) erhalten -
+    # fuer Pixel reicht das, die Kennzahlen laufen weiter in float64
+    import numpy as np
+
+    state, first, buf, n, stride, offset = _new_state(), None, None, 0, 1, 0
+    for a in chunks:
+        _update_state(state, a)
+        if keep_plot:
+            if offset == 0:
+                first = a  # einzelner Chunk: ohne Kopie behalten
+            else:
+                if buf is None:
+                    buf = np.empty(PLOT_KEEP_POINTS, dtype=np.float32)
+                    stride = max(1, chunksize // PLOT_CHUNK_POINTS)
+                    n, stride = _plot_keep(buf, 0, first, 0, stride)
+                    first = None
+                n, stride = _plot_keep(buf, n, a, offset, stride)
+        offset += a.size
+    if buf is not None:
+        return state, [(0, buf[:n])], stride
+    return state, [(0, first)] if first is not None else [], stride
+
+
+def _scan_equity(csv_path, column, chunksize, keep_plot=True, fast=False):
+    # Datei chunkweise durchlaufen: Speicher O(chunksize) statt O(Datei).
+    # Reihenfolge: pyarrow (falls installiert) -> loadtxt -> pandas;
+    # fast=True: nur loadtxt, weder pyarrow- noch pandas-Import
+    names = _header_names(csv_path)
+    if names is not None and column not in names:
+        print(f"Spalte '{column}' fehlt in {csv_path} (vorhanden: {', '.join(names)})")
+        sys.exit(1)
+    if names is not None and not fast:
+        try:
+            return _consume(_iter_arrow(csv_path, column, chunksize), chunksize, keep_plot)
+        except (ImportError, ValueError):
+            pass
+    if names is not None:
+        col = names.index(column)
+        try:
+            return _consume(_iter_loadtxt(csv_path, col, chunksize), chunksize, keep_plot)
+        except ValueError as e:
+            if fast:
+                print("CSV nicht lesbar (--fast):", e)
+                sys.exit(1)
+    elif fast:
+        print(f"CSV-Kopfzeile nicht lesbar (--fast): {csv_path}")
+        sys.exit(1)
+    try:
+        return _consume(_iter_pandas(csv_path, column, chunksize), chunksize, keep_plot)
+    except ValueError as e:
+        print("CSV nicht lesbar:", e)
+        sys.exit(1)
+
+
+def _plot_points(parts, stride):
+    # behaltene Punkte zusammensetzen und auf hoechstens ~PLOT_MAX_POINTS ausduennen
+    import numpy as np
+
+    if not parts:
+        return np.empty(0), np.empty(0, dtype=np.float32)
+    ys = np.concatenate([part for _, part in parts])
+    xs = np.concatenate([np.arange(off, off + part.size * stride, stride) for off, part in parts])
+    step = max(1, ys.size // PLOT_MAX_POINTS)
+    return xs[::step], ys[::step].astype(np.float32)
+
+
+def _cache_path(csv_path, column):
+    st = csv_path.stat()
+    key = f"{CACHE_VERSION}|{csv_path.resolve()}|{column}|{st.st_size}|{st.st_mtime_ns}"
+    return CACHE_DIR / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.npz"
+
+
+def _load_cache(path, need_plot):
+    # None bei fehlendem/kaputtem Eintrag oder wenn Plotpunkte gebraucht, aber nicht da sind
+    import numpy as np
+
+    try:
+        with np.load(path) as d:
+            stats, xs, ys, has_plot = d["stats"], d["xs"], d["ys"], bool(d["has_plot"])
+    except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+        # abgeschnittene/fremde Datei: wie ein Cache-Miss behandeln
+        return None
+    if stats.size != len(_STATE_KEYS) or (need_plot and not has_plot):
+        return None
+    state = dict(zip(_STATE_KEYS, stats.tolist()))
+    state["n"] = int(state["n"])
+    return state, xs, ys
+
+
+def _save_cache(path, state, xs, ys, has_plot):
+    import numpy as np
+
+    stats = np.array([state[k] for k in _STATE_KEYS], dtype=np.float64)
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            np.savez(f, stats=stats, xs=xs, ys=ys, has_plot=np.bool_(has_plot))
+        os.replace(tmp, path)
+    except OSError as e:
+        print("Cache nicht geschrieben:", e)
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -11,10 +341,24 @@ def main():
     parser.add_argument(
         "--csv",
         default="bridge_out/reports/equity_curve.csv",
-        help="Pfad zur Equity-Curve-CSV (Spalte 'equity' oder letzte Spalte)",
+        help="Pfad zur Equity-Curve-CSV",
     )
+    parser.add_argument("--column", default="equity", help="Name der Equity-Spalte")
     parser.add_argument(
-        "--out", default="bridge_out/reports/equity_curve.png", help="Pfad fuer den Plot (PNG)"
+        "--out", help=f"Pfad fuer den Plot (PNG, impliziert --plot; Standard: {DEFAULT_OUT})"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=1_000_000,
+        help="Zeilen je Lese-Chunk (begrenzt den Speicher bei grossen CSVs)",
+    )
+    parser.add_argument("--plot", action="store_true", help="Plot erzeugen (sonst nur Kennzahlen)")
+    parser.add_argument(
+        "--fast", action="store_true", help="nur NumPy-Pfad (loadtxt), kein pandas-Fallback"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help=f"Cache unter {CACHE_DIR} ignorieren"
     )
     args = parser.parse_args()
 
@@ -23,27 +367,28 @@ def main():
         print(f"CSV nicht gefunden: {csv_path}")
         sys.exit(1)
 
-    try:
-        import pandas as pd
-    except Exception as e:
-        print("pandas nicht installiert:", e)
-        sys.exit(1)
-
-    df = pd.read_csv(csv_path)
-    if df.shape[1] == 1:
-        df.columns = ["equity"]
-    elif "equity" not in df.columns:
-        df.rename(columns={df.columns[-1]: "equity"}, inplace=True)
+    # Plot nur auf Wunsch: headless Pipelines sparen matplotlib-Import und Rendering
+    keep_plot = args.plot or args.out is not None
+    cache_path = None if args.no_cache else _cache_path(csv_path, args.column)
+    cached = _load_cache(cache_path, keep_plot) if cache_path else None
+    if cached:
+        state, xs, ys = cached
+    else:
+        state, parts, stride = _scan_equity(
+            csv_path, args.column, max(1, args.chunksize), keep_plot=keep_plot, fast=args.fast
+        )
+        if state["start"] is None:
+            print(f"CSV ohne Daten: {csv_path}")
+            sys.exit(1)
+        xs, ys = _plot_points(parts, stride)
+        del parts
+        if cache_path:
+            _save_cache(cache_path, state, xs, ys, keep_plot)
 
-    eq = df["equity"].astype(float)
-    start, end = float(eq.iloc[0]), float(eq.iloc[-1])
+    start, end = state["start"], state["end"]
     total_return = (end / start) - 1 if start else float("nan")
-    rets = eq.pct_change().dropna()
-    vol = (rets.std() * (len(rets) ** 0.5)) if not rets.empty else float("nan")
-
-    running_max = eq.cummax()
-    drawdown = (eq / running_max) - 1.0
-    max_dd = float(drawdown.min())
+    max_dd = state["max_dd"]
+    vol = _volatility(state["n"], state["m2"])
 
     print(f"Start: {start:.2f}")
     print(f"Ende:  {end:.2f}")
@@ -51,6 +396,10 @@ def main():
     print(f"Max Drawdown: {max_dd * 100:.2f}%")
     print(f"Volatilitaet (ann. grob): {vol * 100:.2f}%")
 
+    if not keep_plot:
+        return
+
+    # matplotlib erst hier importieren: kostet sonst auch ohne Plot mehrere 100 ms
     try:
         import matplotlib
 
@@ -58,13 +407,13 @@ def main():
         import matplotlib.pyplot as plt
 
         plt.figure()
-        plt.plot(eq.values)
+        plt.plot(xs, ys, rasterized=True)
         plt.title("Equity Curve")
         plt.xlabel("Index")
         plt.ylabel("Equity")
-        out_path = Path(args.out)
+        out_path = Path(args.out or DEFAULT_OUT)
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(out_path, bbox_inches="tight")
+        plt.savefig(out_path, dpi=100, bbox_inches="tight")
         print(f"Plot gespeichert: {out_path}")
     except Exception as e:
         print("Plot uebersprungen:", e)
@@ -8,16 +8,27 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 from config_loader import load_config
 
 
+def validate(path: Path = Path("config/config.yaml")):
+    # load_config cached bereits je (Pfad, mtime_ns): wiederholte Aufrufe aus Tests/CI
+    # parsen die YAML nur nach einer Aenderung neu
+    return load_config(path)
+
+
+# Reihenfolge der Ausgabe; Spaltenbreite 24 = laengster Feldname
+FIELDS = (
+    "risk_per_trade_pct",
+    "max_drawdown_pct",
+    "day_loss_limit_pct",
+    "atr_stop_mult",
+    "atr_tp_mult",
+    "max_concurrent_positions",
+)
+
+
 def main():
-    cfg = load_config(Path("config/config.yaml"))
-    r = cfg.risk
-    print("CONFIG OK")
-    print(f" risk_per_trade_pct      = {r.risk_per_trade_pct}")
-    print(f" max_drawdown_pct        = {r.max_drawdown_pct}")
-    print(f" day_loss_limit_pct      = {r.day_loss_limit_pct}")
-    print(f" atr_stop_mult           = {r.atr_stop_mult}")
-    print(f" atr_tp_mult             = {r.atr_tp_mult}")
-    print(f" max_concurrent_positions= {r.max_concurrent_positions}")
+    r = validate().risk
+    # ein write statt sieben print-Aufrufe
+    sys.stdout.write("CONFIG OK\n" + "".join(f" {k:<24}= {getattr(r, k)}\n" for k in FIELDS))
 
 
 if __name__ == "__main__":
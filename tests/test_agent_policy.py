@@ -0,0 +1,196 @@
+import asyncio
+import difflib
+import importlib
+import os
+
+import pytest
+
+pytest.importorskip("watchdog")
+
+
+@pytest.fixture(scope="module")
+def agent_service(tmp_path_factory):
+    # agent_service legt beim Import agent_inbox/, policies/ ... im CWD an
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("agent"))
+    try:
+        yield importlib.import_module("agent_service")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture()
+def policy(agent_service):
+    return agent_service.compile_policy(agent_service.DEFAULT_POLICY)
+
+
+def _baseline_allowed(rel, policy):
+    # Referenz: die urspruengliche Schleife ueber allowed_paths
+    rel = rel.replace("\\", "/")
+    for pat in policy.get("allowed_paths", []):
+        if rel == pat or rel.startswith(pat.rstrip("/") + "/"):
+            return True
+    return False
+
+
+@pytest.mark.parametrize(
+    "rel",
+    [
+        "bot.py",
+        "dashboard.py",
+        "strategies/momentum.py",
+        "strategies",
+        "strategies/",
+        "configs/a/b.yaml",
+        ".vscode\\settings.json",
+        "bot.pyc",
+        "bot.py.bak",
+        "xbot.py",
+        "agent_service.py",
+        "strategiesX/evil.py",
+        "",
+    ],
+)
+def test_allow_list_matches_baseline(agent_service, policy, rel):
+    assert agent_service.is_allowed_path(rel, policy) == _baseline_allowed(rel, policy)
+
+
+@pytest.mark.parametrize("rel", ["bot.py\n", "dashboard.py\n", "strategies\n"])
+def test_trailing_newline_rejected(agent_service, policy, rel):
+    assert not agent_service.is_allowed_path(rel, policy)
+
+
+@pytest.mark.parametrize(
+    "rel",
+    ["../bot.py", "strategies/../.env", "strategies/../../etc/passwd", "configs\\..\\secrets.txt"],
+)
+def test_parent_segments_rejected(agent_service, policy, rel):
+    assert not agent_service.is_allowed_path(rel, policy)
+
+
+def test_empty_allow_list_allows_nothing(agent_service):
+    policy = agent_service.compile_policy({"allowed_paths": []})
+    assert not agent_service.is_allowed_path("bot.py", policy)
+    assert not agent_service.is_allowed_path("", policy)
+
+
+def _run_dispatch(agent_service, path):
+    # dispatch() braucht eine laufende Schleife; gestartete Tasks bis zum Ende abwarten
+    async def go():
+        agent_service.dispatch(path)
+        await asyncio.gather(*list(agent_service._RUNNING))
+
+    asyncio.run(go())
+
+
+def test_partial_task_is_retried_not_failed(agent_service, tmp_path, monkeypatch):
+    runs = []
+
+    async def record(task, _policy):
+        runs.append(task)
+
+    monkeypatch.setitem(agent_service.ACTIONS, "restart_bot", record)
+    path = tmp_path / "task_1.json"
+    path.write_text('{"type": "rest')  # noch halb geschrieben
+    _run_dispatch(agent_service, path)
+    assert runs == [] and path in agent_service._PENDING_TASKS
+    assert not list(agent_service.OUTBOX.glob("*_error.json"))
+
+    path.write_text('{"type": "restart_bot"}')
+    _run_dispatch(agent_service, path)  # modified-Event
+    _run_dispatch(agent_service, path)  # weiteres Event derselben Datei: kein zweiter Lauf
+    assert runs == [{"type": "restart_bot"}]
+    assert path not in agent_service._PENDING_TASKS
+
+
+def test_unparsable_task_fails_after_timeout(agent_service, tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_service, "TASK_PARSE_TIMEOUT_SEC", 0.0)
+    path = tmp_path / "broken.json"
+    path.write_text("{not json")
+    before = set(agent_service.OUTBOX.glob("*_error.json"))
+    _run_dispatch(agent_service, path)
+    assert len(set(agent_service.OUTBOX.glob("*_error.json")) - before) == 1
+    assert path not in agent_service._PENDING_TASKS
+
+
+# --- make_diff: von Hand gebaute Hunks (fast_diff_match_patch) vs. difflib ---
+
+DIFF_CASES = [
+    ("a\nb\nc\n", "a\nB\nc\n"),
+    (
+        "".join(f"line {i}\n" for i in range(40)),
+        "".join(f"line {i}\n" for i in range(40) if i != 5),
+    ),
+    ("x\n" * 3 + "keep\n" * 20 + "y\n", "x\n" * 2 + "keep\n" * 20 + "y\nz\n"),
+    ("", "new file\n"),
+    ("old\n", ""),
+    ("no newline", "no newline\nadded"),
+    ("same\n", "same\n"),
+]
+
+
+def _apply(old, diff):
+    # minimaler Unified-Diff-Patcher: Kontext-/Loeschzeilen muessen exakt passen
+    a = old.splitlines(keepends=True)
+    hunks = []
+    for line in diff.splitlines(keepends=True)[2:]:
+        if line.startswith("@@"):
+            old_range = line.split(" ")[1][1:].split(",")
+            start = int(old_range[0])
+            if len(old_range) == 1 or int(old_range[1]):
+                start -= 1
+            hunks.append((start, []))
+        elif line.startswith("\\"):
+            tag, text = hunks[-1][1][-1]
+            hunks[-1][1][-1] = (tag, text[:-1])  # "\ No newline at end of file"
+        else:
+            hunks[-1][1].append((line[0], line[1:]))
+    out, pos = [], 0
+    for start, entries in hunks:
+        out += a[pos:start]
+        pos = start
+        for tag, text in entries:
+            if tag in " -":
+                assert a[pos] == text
+                pos += 1
+            if tag in " +":
+                out.append(text)
+    return "".join(out + a[pos:])
+
+
+def _difflib(old, new, path="bot.py"):
+    a, b = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    lines = difflib.unified_diff(a, b, fromfile=path, tofile=path)
+    return "".join(x if x.endswith("\n") else x + "\n\\ No newline at end of file\n" for x in lines)
+
+
+@pytest.mark.parametrize("old, new", DIFF_CASES)
+def test_dmp_diff_applies_cleanly(agent_service, old, new):
+    pytest.importorskip("fast_diff_match_patch")
+    assert agent_service._DMP_AVAILABLE
+    diff = agent_service.make_diff(old, new, "bot.py")
+    assert (diff == "") == (old == new)
+    if diff:
+        assert diff.startswith("--- bot.py\n+++ bot.py\n")
+    assert _apply(old, diff) == new
+
+
+@pytest.mark.parametrize("old, new", [c for i, c in enumerate(DIFF_CASES) if i != 2])
+def test_dmp_diff_matches_difflib(agent_service, old, new):
+    # eindeutige Aenderungen (nicht Fall 2: welches "x" entfaellt, ist offen): gleiche Hunks
+    # wie difflib.unified_diff
+    pytest.importorskip("fast_diff_match_patch")
+    assert agent_service.make_diff(old, new, "bot.py") == _difflib(old, new)
+
+
+@pytest.mark.parametrize("old, new", DIFF_CASES)
+def test_diff_without_dmp_is_difflib(agent_service, monkeypatch, old, new):
+    monkeypatch.setattr(agent_service, "_DMP_AVAILABLE", False)
+    assert agent_service.make_diff(old, new, "bot.py") == _difflib(old, new)
+
+
+def test_diff_falls_back_when_too_many_distinct_lines(agent_service, monkeypatch):
+    monkeypatch.setattr(agent_service, "_DMP_MAX_LINES", 4)
+    old = "".join(f"{i}\n" for i in range(10))
+    new = old.replace("5\n", "five\n")
+    assert agent_service.make_diff(old, new, "bot.py") == _difflib(old, new)
@@ -0,0 +1,123 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+import backtest  # noqa: E402
+
+KERNELS = [backtest._equity_stats_np, backtest.equity_stats_loop]
+
+
+def _reference(values):
+    # Baseline-Skript mit pandas 2.x: pct_change() fuellt Luecken per pad, dropna() danach
+    eq = pd.Series(values, dtype=float)
+    filled = eq.ffill()
+    rets = (filled / filled.shift(1) - 1).dropna()
+    vol = rets.std() * len(rets) ** 0.5 if not rets.empty else float("nan")
+    return float(eq.iloc[0]), float(eq.iloc[-1]), float((eq / eq.cummax() - 1).min()), vol
+
+
+def _run(values, kernel, chunksize, monkeypatch):
+    monkeypatch.setattr(backtest, "_equity_stats", kernel)
+    a = np.asarray(values, dtype=np.float64)
+    state = backtest._new_state()
+    for i in range(0, a.size, chunksize):
+        backtest._update_state(state, np.ascontiguousarray(a[i : i + chunksize]))
+    vol = backtest._volatility(state["n"], state["m2"])
+    return state["start"], state["end"], state["max_dd"], vol
+
+
+def _assert_close(got, expected):
+    for g, e in zip(got, expected):
+        assert (math.isnan(g) and math.isnan(e)) or g == pytest.approx(e, rel=1e-9)
+
+
+# Start bei 0 erzeugt inf-Returns wie im Baseline-Skript
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("kernel", KERNELS)
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 1000])
+@pytest.mark.parametrize(
+    "values",
+    [
+        [100.0, float("nan"), 99.0],
+        [float("nan"), float("nan"), 100.0, 101.0, float("nan"), 99.0, 98.0, float("nan")],
+        [100.0, 0.0, 0.0, 5.0, float("nan"), 7.0],
+    ],
+)
+def test_nan_gaps_match_pandas(values, kernel, chunksize, monkeypatch):
+    _assert_close(_run(values, kernel, chunksize, monkeypatch), _reference(values))
+
+
+def test_blank_cell_in_csv(tmp_path):
+    csv = tmp_path / "eq.csv"
+    csv.write_text("ts,equity\n1,100\n2,\n3,99\n")
+    state, _parts, _stride = backtest._scan_equity(csv, "equity", 2, keep_plot=False)
+    vol = backtest._volatility(state["n"], state["m2"])
+    _assert_close((state["start"], state["end"], state["max_dd"], vol), _reference([100, None, 99]))
+
+
+@pytest.mark.parametrize("cut", [0, 1, 10, 100, -20])
+def test_truncated_cache_is_a_miss(tmp_path, cut):
+    state = backtest._new_state()
+    backtest._update_state(state, np.array([100.0, 101.0, 99.0]))
+    path = tmp_path / "entry.npz"
+    backtest._save_cache(path, state, np.arange(3), np.ones(3, dtype=np.float32), True)
+    assert backtest._load_cache(path, need_plot=True)[0]["n"] == 2
+    path.write_bytes(path.read_bytes()[:cut])
+    assert backtest._load_cache(path, need_plot=True) is None
+
+
+def test_cache_key_includes_version(tmp_path, monkeypatch):
+    csv = tmp_path / "eq.csv"
+    csv.write_text("ts,equity\n1,100\n")
+    key = backtest._cache_path(csv, "equity")
+    monkeypatch.setattr(backtest, "CACHE_VERSION", backtest.CACHE_VERSION + 1)
+    assert backtest._cache_path(csv, "equity") != key
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 100, 5000])
+def test_plot_points_bounded_for_small_chunks(chunksize, monkeypatch):
+    monkeypatch.setattr(backtest, "PLOT_KEEP_POINTS", 64)
+    monkeypatch.setattr(backtest, "PLOT_CHUNK_POINTS", 10)
+    a = np.arange(5000, dtype=np.float64)  # Wert == Zeilenindex
+    chunks = (a[i : i + chunksize] for i in range(0, a.size, chunksize))
+    _state, parts, stride = backtest._consume(chunks, chunksize, keep_plot=True)
+    ys = np.concatenate([part for _, part in parts])
+    assert ys.size <= 64 or (len(parts) == 1 and chunksize >= a.size)
+    # behaltene Punkte liegen auf dem Raster x = i * stride und decken die Datei ab
+    np.testing.assert_array_equal(ys, np.arange(0, a.size, stride, dtype=np.float32))
+
+
+def _moments(x):
+    x = np.asarray(x, dtype=np.float64)
+    if not x.size:
+        return 0, 0.0, 0.0
+    return x.size, float(x.mean()), float(((x - x.mean()) ** 2).sum())
+
+
+@pytest.mark.parametrize("splits", [[0], [1], [500], [0, 0, 999], [3, 4, 5, 900], [999]])
+def test_merge_moments_matches_one_shot(splits):
+    x = np.random.default_rng(7).standard_normal(1000) * 1e-3 + 1e4  # grosser Offset
+    state = (0, 0.0, 0.0)
+    for part in np.split(x, splits):
+        state = backtest._merge_moments(*state, *_moments(part))
+    n, mean, m2 = state
+    assert n == x.size
+    assert mean == pytest.approx(x.mean(), rel=1e-12)
+    assert m2 / (n - 1) == pytest.approx(x.var(ddof=1), rel=1e-9)
+
+
+@pytest.mark.parametrize("kernel", KERNELS)
+def test_chunked_equals_one_shot(kernel, monkeypatch):
+    rng = np.random.default_rng(3)
+    values = 1e4 * np.exp(rng.standard_normal(3000).cumsum() * 1e-3)
+    values[rng.integers(0, values.size, 50)] = np.nan
+    one_shot = _run(values, kernel, values.size, monkeypatch)
+    assert math.isfinite(one_shot[3])
+    for chunksize in (1, 17, 999):
+        _assert_close(_run(values, kernel, chunksize, monkeypatch), one_shot)
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import bridge_io
+
+
+def _write_jsonl(path, events, partial=b""):
+    with open(path, "wb") as f:
+        for e in events:
+            f.write(json.dumps(e).encode() + b"\n")
+        f.write(partial)
+
+
+@pytest.mark.parametrize("block", [1, 7, 64, 1 << 16])
+@pytest.mark.parametrize(
+    "since_ms, limit", [(0, None), (1050, None), (0, 10), (1090, 3), (5000, 5)]
+)
+def test_jsonl_tail_matches_full_scan(tmp_path, monkeypatch, block, since_ms, limit):
+    monkeypatch.setattr(bridge_io, "TAIL_BLOCK", block)
+    events = [{"ts": 1000 + i, "event": "close", "profit": i * 0.5} for i in range(100)]
+    path = tmp_path / "trades.jsonl"
+    _write_jsonl(path, events, partial=b'{"ts": 2000, "ev')
+    expected = [e for e in events if e["ts"] >= since_ms]
+    if limit is not None:
+        expected = expected[-limit:]
+    assert bridge_io.read_jsonl_tail(path, since_ms, limit) == expected
+
+
+def test_jsonl_tail_missing_and_empty(tmp_path):
+    assert bridge_io.read_jsonl_tail(tmp_path / "nope.jsonl") == []
+    (tmp_path / "empty.jsonl").write_bytes(b"")
+    assert bridge_io.read_jsonl_tail(tmp_path / "empty.jsonl") == []
+
+
+def test_cache_only_for_reread_files(tmp_path):
+    bridge_io._parse.cache_clear()
+    snap = tmp_path / "current.json"
+    snap.write_text('{"exposures": []}')
+    assert bridge_io.load_cached(snap) is bridge_io.load_cached(snap)
+    assert bridge_io._parse.cache_info().hits == 1
+    event = tmp_path / "1000_e.json"
+    event.write_text('{"ts": 1000}')
+    assert bridge_io.read_json(event) == {"ts": 1000}
+    assert bridge_io._parse.cache_info().currsize == 1
+    assert bridge_io._parse.cache_info().maxsize <= 256
@@ -0,0 +1,89 @@
+import importlib
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def coop_bridge(tmp_path_factory):
+    # coop_bridge legt beim Import bridge_out/... im CWD an
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("bridge"))
+    try:
+        yield importlib.import_module("coop_bridge")
+    finally:
+        os.chdir(cwd)
+
+
+def _write(path, name, payload):
+    path.mkdir(parents=True, exist_ok=True)
+    (path / name).write_text(json.dumps(payload))
+
+
+def test_new_events_read_out_of_order_names(coop_bridge, tmp_path):
+    d = tmp_path / "trades"
+    cursor = {}
+    _write(d, "2000_a.json", {"ts": 2000})
+    assert [e["ts"] for e in coop_bridge._read_new_events(d, cursor)] == [2000]
+    # lexikografisch vor dem zuletzt gelesenen Namen (z. B. Uhrsprung) -> trotzdem neu
+    _write(d, "1000_b.json", {"ts": 1000})
+    assert [e["ts"] for e in coop_bridge._read_new_events(d, cursor)] == [1000]
+    assert coop_bridge._read_new_events(d, cursor) == []
+
+
+def test_new_events_migrates_last_file_cursor(coop_bridge, tmp_path):
+    d = tmp_path / "equity"
+    _write(d, "1000_a.json", {"ts": 1000})
+    _write(d, "3000_c.json", {"ts": 3000})
+    cursor = {"last_file": "2000_b.json"}
+    assert [e["ts"] for e in coop_bridge._read_new_events(d, cursor)] == [3000]
+    assert coop_bridge._read_new_events(d, cursor) == []
+
+    # Zwischenstand mit vollstaendiger Namensliste
+    cursor = {"seen": ["1000_a.json", "3000_c.json"], "offset": 0}
+    assert coop_bridge._read_new_events(d, cursor) == []
+    assert "seen" not in cursor and cursor["last_file"] == "3000_c.json"
+
+
+def test_cursor_stays_bounded(coop_bridge, tmp_path):
+    d = tmp_path / "trades"
+    cursor = {}
+    step = coop_bridge.LEGACY_LATE_MS // 4
+    for i in range(40):
+        _write(d, f"{1000 + i * step}_x.json", {"ts": i})
+        assert [e["ts"] for e in coop_bridge._read_new_events(d, cursor)] == [i]
+    # nur Namen aus dem Nachlese-Fenster bleiben im Zustand
+    assert len(cursor["recent"]) <= 5
+    # Nachzuegler innerhalb des Fensters wird gelesen, einer davor nicht
+    _write(d, f"{1000 + 38 * step + 1}_late.json", {"ts": 100})
+    _write(d, f"{1000 + 10 * step + 1}_old.json", {"ts": 101})
+    assert [e["ts"] for e in coop_bridge._read_new_events(d, cursor)] == [100]
+
+
+def test_incremental_status_matches_full_recompute(coop_bridge, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for d in (coop_bridge.EVENTS_DIR / "trades", coop_bridge.EVENTS_DIR / "equity"):
+        d.mkdir(parents=True)
+    coop_bridge.REPORTS_DIR.mkdir(parents=True)
+    trades = coop_bridge.EVENTS_DIR / "trades"
+    profits = [12.0, -5.0, 0.0, 30.0, -40.0, 8.0, -2.5, 15.0]
+    ts = 1000
+    for batch in (profits[:3], profits[3:4], [], profits[4:]):
+        with open(trades.with_suffix(".jsonl"), "a") as f:
+            for p in batch:
+                ts += 1
+                f.write(json.dumps({"ts": ts, "event": "close", "profit": p, "fees": 0.5}) + "\n")
+                f.write(json.dumps({"ts": ts, "event": "open", "symbol": "X"}) + "\n")
+        # Altformat-Datei mit einem Namen vor dem letzten (Uhrsprung)
+        ts += 1
+        _write(trades, f"{9999 - ts}_t.json", {"ts": ts, "event": "close", "profit": 1.0})
+        coop_bridge.publish_status()
+
+    status = json.loads((coop_bridge.REPORTS_DIR / "status.json").read_text())
+    full = coop_bridge.compute_trade_metrics(coop_bridge._read_json_files(trades))
+    assert status["realized_pnl"] == pytest.approx(full[0])
+    assert status["profit_factor"] == round(full[1], 3)
+    assert status["winrate_pct"] == round(full[2], 2)
+    assert status["max_drawdown_pct"] == round(full[3], 2)
+    assert status["counts"]["trades_total"] == len(coop_bridge._read_json_files(trades))
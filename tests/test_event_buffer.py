@@ -0,0 +1,82 @@
+import importlib
+import os
+import threading
+
+import pytest
+
+from event_buffer import EventBuffer
+
+
+def test_size_triggered_flush(tmp_path):
+    buf = EventBuffer(tmp_path, max_bytes=32, max_age_sec=60)
+    buf.append("trades", b'{"ts":1}\n')
+    assert not buf.path("trades").exists()  # unter der Grenze: noch im Speicher
+    buf.append("trades", b'{"ts":2,"pad":"xxxxxxxxxxxxxxxx"}\n')
+    assert buf.path("trades").read_bytes().count(b"\n") == 2
+    assert buf.size == 0 and buf.timer is None
+
+
+def test_timer_flush(tmp_path):
+    buf = EventBuffer(tmp_path, max_bytes=1 << 20, max_age_sec=0.05)
+    buf.append("equity", b'{"ts":1}\n')
+    timer = buf.timer
+    assert timer is not None
+    timer.join(2)
+    assert buf.path("equity").read_bytes() == b'{"ts":1}\n'
+    assert buf.timer is None
+
+
+def test_append_order_per_kind(tmp_path):
+    buf = EventBuffer(tmp_path, max_bytes=100, max_age_sec=60)
+    lines = {k: [f'{{"kind":"{k}","i":{i}}}\n'.encode() for i in range(50)] for k in ("a", "b")}
+    for i in range(50):
+        buf.append("a", lines["a"][i])
+        buf.append("b", lines["b"][i])
+    buf.flush_all()
+    for k in ("a", "b"):
+        assert buf.path(k).read_bytes() == b"".join(lines[k])
+
+
+def test_concurrent_appends_keep_lines_whole(tmp_path):
+    buf = EventBuffer(tmp_path, max_bytes=256, max_age_sec=60)
+
+    def writer(t):
+        for i in range(200):
+            buf.append("trades", f"{t}:{i}\n".encode())
+
+    threads = [threading.Thread(target=writer, args=(t,)) for t in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    buf.flush_all()
+    got = buf.path("trades").read_text().splitlines()
+    assert sorted(got) == sorted(f"{t}:{i}" for t in range(4) for i in range(200))
+    for t in range(4):
+        # je Schreiber bleibt die Reihenfolge erhalten
+        assert [int(x.split(":")[1]) for x in got if x.startswith(f"{t}:")] == list(range(200))
+
+
+@pytest.fixture(scope="module")
+def coop_bridge(tmp_path_factory):
+    # coop_bridge legt beim Import bridge_out/... im CWD an
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("bridge"))
+    try:
+        yield importlib.import_module("coop_bridge")
+    finally:
+        os.chdir(cwd)
+
+
+def test_reader_skips_incomplete_trailing_line(coop_bridge, tmp_path):
+    fn = tmp_path / "trades.jsonl"
+    fn.write_bytes(b'{"ts":1}\n{"ts":2}\n{"ts":3,"ev')
+    items, offset = coop_bridge._read_jsonl_from(fn)
+    assert [d["ts"] for d in items] == [1, 2]
+    assert offset == len(b'{"ts":1}\n{"ts":2}\n')
+    # Zeile wird fertig geschrieben: ab dem Offset genau einmal gelesen
+    with open(fn, "ab") as f:
+        f.write(b'ent":"close"}\n')
+    items, offset = coop_bridge._read_jsonl_from(fn, offset)
+    assert items == [{"ts": 3, "event": "close"}]
+    assert offset == fn.stat().st_size
@@ -0,0 +1,119 @@
+import importlib
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+FAST, SLOW, ATR_LEN = 5, 12, 14
+
+
+@pytest.fixture(scope="module")
+def bot(tmp_path_factory):
+    # bot legt beim Import bridge_out/... im CWD an
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("bot"))
+    try:
+        yield importlib.import_module("bot")
+    finally:
+        os.chdir(cwd)
+
+
+def _bars(bot, n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(n).cumsum()
+    bars = np.zeros(n, dtype=bot.BAR_DTYPE)
+    bars["ts"] = 60 * np.arange(1, n + 1)
+    bars["close"] = close
+    bars["open"] = np.roll(close, 1)
+    bars["high"] = close + rng.random(n)
+    bars["low"] = close - rng.random(n)
+    return bars
+
+
+def _sma(a, n):
+    return np.convolve(a, np.full(n, 1.0 / n), mode="valid")
+
+
+def _reference(bars):
+    # volle Neuberechnung ueber die ganze Historie (wie die frueheren Array-Indikatoren)
+    h, lo, c = bars["high"], bars["low"], bars["close"]
+    pc = np.concatenate(([np.nan], c[:-1]))
+    tr = np.fmax(np.fmax(h - lo, np.abs(h - pc)), np.abs(lo - pc))
+    fast, slow = _sma(c, FAST), _sma(c, SLOW)
+    signal = None
+    if fast[-2] <= slow[-2] and fast[-1] > slow[-1]:
+        signal = "long"
+    elif fast[-2] >= slow[-2] and fast[-1] < slow[-1]:
+        signal = "short"
+    return fast[-1], slow[-1], _sma(tr, ATR_LEN)[-1], signal
+
+
+def _check(state, bars):
+    fast, slow, atr, signal = _reference(bars)
+    assert state.sum_fast / FAST == pytest.approx(fast, rel=1e-9)
+    assert state.sum_slow / SLOW == pytest.approx(slow, rel=1e-9)
+    assert state.atr() == pytest.approx(atr, rel=1e-9)
+    assert state.signal() == signal
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_updates_match_full_recompute(bot, seed):
+    bars = _bars(bot, 300, seed)
+    state = bot.IndicatorState(FAST, SLOW, ATR_LEN)
+    assert state.update(bars[:200])
+    # ueberlappende Update-Fenster wie refresh_state (update_bars > 1)
+    for end in range(201, 301):
+        assert state.update(bars[max(0, end - 5) : end])
+        _check(state, bars[:end])
+
+
+def test_open_bar_replaced_in_place(bot):
+    bars = _bars(bot, 100)
+    state = bot.IndicatorState(FAST, SLOW, ATR_LEN)
+    state.update(bars[:-1])
+    # laufende Kerze erst mit vorlaeufigem, dann mit endgueltigem Wert
+    partial = bars[-1:].copy()
+    partial["close"] += 3.0
+    partial["high"] += 3.0
+    state.update(partial)
+    state.update(bars[-3:])
+    _check(state, bars)
+
+
+def test_gap_requests_full_reload(bot):
+    bars = _bars(bot, 100)
+    state = bot.IndicatorState(FAST, SLOW, ATR_LEN)
+    state.update(bars[:50])
+    assert not state.update(bars[60:])
+
+
+def test_refresh_keeps_state_when_update_has_no_bars(bot, monkeypatch):
+    bars = _bars(bot, 200)
+    calls = []
+
+    def fetch(venue, symbol, limit, since_ts=None):
+        calls.append(since_ts)
+        if since_ts is None:
+            return bars
+        return np.empty(0, dtype=bot.BAR_DTYPE)  # Markt zu: Abruf ok, aber keine Kerzen
+
+    monkeypatch.setattr(bot, "STATES", {})
+    monkeypatch.setattr(bot, "fetch_bars", fetch)
+    state = bot.refresh_state("alpaca", "SPY")
+    assert bot.refresh_state("alpaca", "SPY") is state
+    assert state.last_close == bars["close"][-1]
+    # Update-Fenster ab der letzten bekannten Kerze, kein neuer Voll-Abruf
+    assert calls == [None, int(bars["ts"][-1])]
+
+
+def test_refresh_returns_none_on_fetch_error(bot, monkeypatch):
+    bars = _bars(bot, 200)
+    monkeypatch.setattr(bot, "STATES", {})
+    monkeypatch.setattr(bot, "fetch_bars", lambda *a, since_ts=None: bars)
+    state = bot.refresh_state("alpaca", "SPY")
+    monkeypatch.setattr(bot, "fetch_bars", lambda *a, since_ts=None: None)
+    assert bot.refresh_state("alpaca", "SPY") is None
+    assert bot.STATES["alpaca:SPY"] is state